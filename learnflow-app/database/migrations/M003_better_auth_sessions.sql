@@ -68,5 +68,5 @@ BEGIN
     END IF;
 END $$;
 
--- Note: The 'role' column already exists in our users table as 'user_role' enum
+-- Note: The 'role' column already exists in our users table (VARCHAR + ck_user_role)
 -- Better Auth will use the additionalFields configuration to handle this
@@ -0,0 +1,10 @@
+-- Covering index for progress lookups
+-- calculate_progress and update_progress filter on (student_id[, topic_id]) and
+-- only read the metric columns, so INCLUDE-ing them allows index-only scans
+
+CREATE INDEX IF NOT EXISTS idx_progress_student_topic_metrics
+    ON progress(student_id, topic_id)
+    INCLUDE (exercises_done, quiz_score, code_quality, streak, mastery);
+
+-- Leading column of the index above; no longer needed on its own
+DROP INDEX IF EXISTS idx_progress_student;
@@ -0,0 +1,26 @@
+-- Database-maintained updated_at timestamps
+-- The models rely on server defaults (NOW()) for created_at/updated_at and on
+-- this trigger to refresh updated_at, so writes need no Python-side values
+
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_users_updated_at ON users;
+CREATE TRIGGER trg_users_updated_at
+    BEFORE UPDATE ON users
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS trg_classes_updated_at ON classes;
+CREATE TRIGGER trg_classes_updated_at
+    BEFORE UPDATE ON classes
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS trg_progress_updated_at ON progress;
+CREATE TRIGGER trg_progress_updated_at
+    BEFORE UPDATE ON progress
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
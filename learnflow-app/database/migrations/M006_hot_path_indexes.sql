@@ -0,0 +1,19 @@
+-- Composite indexes for the per-student lookups the agents and chat UI run
+-- (WHERE student_id = ? [AND topic_id = ?] ORDER BY created_at DESC)
+
+-- Chat history, newest first
+CREATE INDEX IF NOT EXISTS idx_chat_student_created
+    ON chat_messages(student_id, created_at DESC);
+
+-- Submissions per student and topic; covers the old student-only index
+CREATE INDEX IF NOT EXISTS idx_submissions_student_topic_created
+    ON code_submissions(student_id, topic_id, created_at);
+DROP INDEX IF EXISTS idx_submissions_student;
+
+-- Created by an earlier version of this migration; it duplicated
+-- idx_execution_submission from the base schema
+DROP INDEX IF EXISTS idx_execution_results_submission;
+
+-- Unresolved struggle events per student for the teacher dashboard
+CREATE INDEX IF NOT EXISTS idx_struggle_student_unresolved
+    ON struggle_events(student_id) WHERE resolved = false;
@@ -0,0 +1,46 @@
+-- Replace native ENUM types with VARCHAR + CHECK constraints
+-- Changing an allowed value is then a constraint swap instead of an
+-- ALTER TYPE, and the driver no longer needs a per-type enum codec.
+-- schema.sql and V001 create these columns as VARCHAR + CHECK already; this
+-- converts databases created before that and is a no-op on newer ones.
+
+DO $$
+BEGIN
+    -- users.role
+    IF EXISTS (SELECT 1 FROM information_schema.columns
+               WHERE table_name = 'users' AND column_name = 'role' AND data_type = 'USER-DEFINED') THEN
+        ALTER TABLE users ALTER COLUMN role DROP DEFAULT;
+        ALTER TABLE users ALTER COLUMN role TYPE VARCHAR(16) USING role::text;
+        ALTER TABLE users ALTER COLUMN role SET DEFAULT 'student';
+        ALTER TABLE users ADD CONSTRAINT ck_user_role CHECK (role IN ('student', 'teacher'));
+    END IF;
+
+    -- exercises.difficulty / quizzes.difficulty
+    IF EXISTS (SELECT 1 FROM information_schema.columns
+               WHERE table_name = 'exercises' AND column_name = 'difficulty' AND data_type = 'USER-DEFINED') THEN
+        ALTER TABLE exercises ALTER COLUMN difficulty DROP DEFAULT;
+        ALTER TABLE exercises ALTER COLUMN difficulty TYPE VARCHAR(16) USING difficulty::text;
+        ALTER TABLE exercises ALTER COLUMN difficulty SET DEFAULT 'medium';
+        ALTER TABLE exercises ADD CONSTRAINT ck_exercise_difficulty CHECK (difficulty IN ('easy', 'medium', 'hard'));
+    END IF;
+
+    IF EXISTS (SELECT 1 FROM information_schema.columns
+               WHERE table_name = 'quizzes' AND column_name = 'difficulty' AND data_type = 'USER-DEFINED') THEN
+        ALTER TABLE quizzes ALTER COLUMN difficulty DROP DEFAULT;
+        ALTER TABLE quizzes ALTER COLUMN difficulty TYPE VARCHAR(16) USING difficulty::text;
+        ALTER TABLE quizzes ALTER COLUMN difficulty SET DEFAULT 'medium';
+        ALTER TABLE quizzes ADD CONSTRAINT ck_quiz_difficulty CHECK (difficulty IN ('easy', 'medium', 'hard'));
+    END IF;
+
+    -- execution_results.error_type (nullable, no default)
+    IF EXISTS (SELECT 1 FROM information_schema.columns
+               WHERE table_name = 'execution_results' AND column_name = 'error_type' AND data_type = 'USER-DEFINED') THEN
+        ALTER TABLE execution_results ALTER COLUMN error_type TYPE VARCHAR(16) USING error_type::text;
+        ALTER TABLE execution_results ADD CONSTRAINT ck_execution_error_type
+            CHECK (error_type IN ('syntax', 'runtime', 'logic', 'timeout', 'memory'));
+    END IF;
+END $$;
+
+DROP TYPE IF EXISTS user_role;
+DROP TYPE IF EXISTS difficulty_level;
+DROP TYPE IF EXISTS error_type;
@@ -4,16 +4,13 @@
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 CREATE EXTENSION IF NOT EXISTS "pgcrypto";
 
-CREATE TYPE user_role AS ENUM ('student', 'teacher');
-CREATE TYPE difficulty_level AS ENUM ('easy', 'medium', 'hard');
-CREATE TYPE error_type AS ENUM ('syntax', 'runtime', 'logic', 'timeout', 'memory');
-
 CREATE TABLE users (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     name VARCHAR(255) NOT NULL,
     email VARCHAR(255) UNIQUE NOT NULL,
     password_hash VARCHAR(255) NOT NULL,
-    role user_role NOT NULL DEFAULT 'student',
+    role VARCHAR(16) NOT NULL DEFAULT 'student'
+        CONSTRAINT ck_user_role CHECK (role IN ('student', 'teacher')),
     class_id UUID,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
@@ -65,7 +62,8 @@ CREATE TABLE execution_results (
     stdout TEXT,
     stderr TEXT,
     success BOOLEAN NOT NULL DEFAULT false,
-    error_type error_type,
+    error_type VARCHAR(16)
+        CONSTRAINT ck_execution_error_type CHECK (error_type IN ('syntax', 'runtime', 'logic', 'timeout', 'memory')),
     execution_time_ms INTEGER,
     memory_used_kb INTEGER,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
@@ -89,7 +87,8 @@ CREATE TABLE quizzes (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     topic_id UUID NOT NULL REFERENCES topics(id) ON DELETE CASCADE,
     title VARCHAR(255) NOT NULL,
-    difficulty difficulty_level NOT NULL DEFAULT 'medium',
+    difficulty VARCHAR(16) NOT NULL DEFAULT 'medium'
+        CONSTRAINT ck_quiz_difficulty CHECK (difficulty IN ('easy', 'medium', 'hard')),
     questions JSONB NOT NULL DEFAULT '[]',
     created_by UUID REFERENCES users(id),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
@@ -110,7 +109,8 @@ CREATE TABLE exercises (
     topic_id UUID NOT NULL REFERENCES topics(id) ON DELETE CASCADE,
     title VARCHAR(255) NOT NULL,
     description TEXT NOT NULL,
-    difficulty difficulty_level NOT NULL DEFAULT 'medium',
+    difficulty VARCHAR(16) NOT NULL DEFAULT 'medium'
+        CONSTRAINT ck_exercise_difficulty CHECK (difficulty IN ('easy', 'medium', 'hard')),
     starter_code TEXT,
     test_cases JSONB NOT NULL DEFAULT '[]',
     hints JSONB DEFAULT '[]',
@@ -6,9 +6,6 @@ CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 CREATE EXTENSION IF NOT EXISTS "pgcrypto";
 
 -- Enums
-CREATE TYPE user_role AS ENUM ('student', 'teacher');
-CREATE TYPE difficulty_level AS ENUM ('easy', 'medium', 'hard');
-CREATE TYPE error_type AS ENUM ('syntax', 'runtime', 'logic', 'timeout', 'memory');
 CREATE TYPE mastery_level AS ENUM ('beginner', 'learning', 'proficient', 'mastered');
 
 -- Users table
@@ -17,7 +14,8 @@ CREATE TABLE users (
     name VARCHAR(255) NOT NULL,
     email VARCHAR(255) UNIQUE NOT NULL,
     password_hash VARCHAR(255) NOT NULL,
-    role user_role NOT NULL DEFAULT 'student',
+    role VARCHAR(16) NOT NULL DEFAULT 'student'
+        CONSTRAINT ck_user_role CHECK (role IN ('student', 'teacher')),
     class_id UUID,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
@@ -75,7 +73,8 @@ CREATE TABLE execution_results (
     stdout TEXT,
     stderr TEXT,
     success BOOLEAN NOT NULL DEFAULT false,
-    error_type error_type,
+    error_type VARCHAR(16)
+        CONSTRAINT ck_execution_error_type CHECK (error_type IN ('syntax', 'runtime', 'logic', 'timeout', 'memory')),
     execution_time_ms INTEGER,
     memory_used_kb INTEGER,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
@@ -101,7 +100,8 @@ CREATE TABLE quizzes (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     topic_id UUID NOT NULL REFERENCES topics(id) ON DELETE CASCADE,
     title VARCHAR(255) NOT NULL,
-    difficulty difficulty_level NOT NULL DEFAULT 'medium',
+    difficulty VARCHAR(16) NOT NULL DEFAULT 'medium'
+        CONSTRAINT ck_quiz_difficulty CHECK (difficulty IN ('easy', 'medium', 'hard')),
     questions JSONB NOT NULL DEFAULT '[]',
     created_by UUID REFERENCES users(id),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
@@ -124,7 +124,8 @@ CREATE TABLE exercises (
     topic_id UUID NOT NULL REFERENCES topics(id) ON DELETE CASCADE,
     title VARCHAR(255) NOT NULL,
     description TEXT NOT NULL,
-    difficulty difficulty_level NOT NULL DEFAULT 'medium',
+    difficulty VARCHAR(16) NOT NULL DEFAULT 'medium'
+        CONSTRAINT ck_exercise_difficulty CHECK (difficulty IN ('easy', 'medium', 'hard')),
     starter_code TEXT,
     test_cases JSONB NOT NULL DEFAULT '[]',
     hints JSONB DEFAULT '[]',
@@ -159,19 +160,43 @@ CREATE INDEX idx_users_role ON users(role);
 CREATE INDEX idx_users_class ON users(class_id);
 CREATE INDEX idx_modules_class ON modules(class_id);
 CREATE INDEX idx_topics_module ON topics(module_id);
-CREATE INDEX idx_submissions_student ON code_submissions(student_id);
+-- Submissions per student (and topic) in time order; covers student-only lookups
+CREATE INDEX idx_submissions_student_topic_created ON code_submissions(student_id, topic_id, created_at);
 CREATE INDEX idx_submissions_topic ON code_submissions(topic_id);
 CREATE INDEX idx_submissions_created ON code_submissions(created_at DESC);
 CREATE INDEX idx_execution_submission ON execution_results(submission_id);
-CREATE INDEX idx_progress_student ON progress(student_id);
+-- Covering index: progress lookups by student[/topic] can be index-only scans
+CREATE INDEX idx_progress_student_topic_metrics ON progress(student_id, topic_id)
+    INCLUDE (exercises_done, quiz_score, code_quality, streak, mastery);
 CREATE INDEX idx_progress_topic ON progress(topic_id);
 CREATE INDEX idx_progress_mastery ON progress(mastery);
 CREATE INDEX idx_quiz_results_student ON quiz_results(student_id);
 CREATE INDEX idx_chat_student ON chat_messages(student_id);
 CREATE INDEX idx_chat_created ON chat_messages(created_at DESC);
+CREATE INDEX idx_chat_student_created ON chat_messages(student_id, created_at DESC);
 CREATE INDEX idx_struggle_student ON struggle_events(student_id);
 CREATE INDEX idx_struggle_topic ON struggle_events(topic_id);
 CREATE INDEX idx_struggle_unresolved ON struggle_events(resolved) WHERE resolved = false;
+CREATE INDEX idx_struggle_student_unresolved ON struggle_events(student_id) WHERE resolved = false;
+
+-- updated_at is maintained by the database (the models don't set it)
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_users_updated_at
+    BEFORE UPDATE ON users
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER trg_classes_updated_at
+    BEFORE UPDATE ON classes
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER trg_progress_updated_at
+    BEFORE UPDATE ON progress
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
 
 -- Seed: Default 8 Python modules (inserted per-class via migration)
 -- Basics, Control Flow, Data Structures, Functions, OOP, Files, Errors, Libraries
@@ -0,0 +1,199 @@
+"""Static analysis kernels for the Code Review Agent.
+
+Kept free of FastAPI/Pydantic imports and fully annotated so the module can
+be compiled with mypyc (see Dockerfile.agent). Falls back to plain Python
+when no compiled extension is present.
+"""
+import ast
+import re
+
+
+def _is_snake(name: str) -> bool:
+    """snake_case check; the parser already guarantees a valid identifier."""
+    return name.isascii() and name.replace("_", "a").islower()
+
+
+def _is_pascal(name: str) -> bool:
+    """PascalCase check; the parser already guarantees a valid identifier."""
+    return name[:1].isupper() and name.isascii() and name.isalnum()
+
+
+def parse_code(code: str) -> ast.AST | None:
+    """Parse code once for all checks. Returns None on syntax errors."""
+    try:
+        return ast.parse(code)
+    except SyntaxError:
+        return None
+
+
+def check_syntax(code: str) -> tuple[bool, str]:
+    """Check if code has syntax errors."""
+    try:
+        ast.parse(code)
+        return True, "No syntax errors found."
+    except SyntaxError as e:
+        return False, f"Syntax error at line {e.lineno}: {e.msg}"
+
+
+def check_style(code: str, tree: ast.AST | None) -> tuple[int, list[str]]:
+    """Check PEP 8 style issues. Returns (deductions, issues).
+
+    Naming checks need the parsed tree and are skipped when it is None.
+    """
+    issues: list[str] = []
+    deductions = 0
+    lines = code.split("\n")
+
+    for i, line in enumerate(lines, 1):
+        # Line length
+        if len(line) > 79:
+            issues.append(f"Line {i}: exceeds 79 characters ({len(line)} chars)")
+            deductions += 1
+
+        # Trailing whitespace
+        if line != line.rstrip():
+            issues.append(f"Line {i}: trailing whitespace")
+            deductions += 1
+
+        # Tabs instead of spaces
+        if "\t" in line:
+            issues.append(f"Line {i}: use spaces instead of tabs")
+            deductions += 1
+
+        # Deductions are capped at 5 and issues at 10 - once both are full,
+        # further findings change neither the score nor the feedback
+        if deductions >= 5 and len(issues) >= 10:
+            break
+
+    # Missing blank lines around functions/classes
+    for i, line in enumerate(lines):
+        if deductions >= 5 and len(issues) >= 10:
+            break
+        stripped = line.strip()
+        if stripped.startswith("def ") or stripped.startswith("class "):
+            if i > 0 and lines[i - 1].strip() != "" and not lines[i - 1].strip().startswith("@"):
+                issues.append(f"Line {i+1}: missing blank line before function/class definition")
+                deductions += 1
+
+    # Naming conventions (locals keep attribute lookups out of the walk loop)
+    if tree is not None and not (deductions >= 5 and len(issues) >= 10):
+        _FD, _AFD, _CD = ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef
+        _snake, _pascal = _is_snake, _is_pascal
+        for node in ast.walk(tree):
+            t = type(node)
+            if t is _FD or t is _AFD:
+                name: str = node.name  # type: ignore[attr-defined]
+                if name != "__init__" and not _snake(name):
+                    issues.append(f"Function '{name}': use snake_case naming")
+                    deductions += 1
+                    if deductions >= 5 and len(issues) >= 10:
+                        break
+            elif t is _CD:
+                name = node.name  # type: ignore[attr-defined]
+                if not _pascal(name):
+                    issues.append(f"Class '{name}': use PascalCase naming")
+                    deductions += 1
+                    if deductions >= 5 and len(issues) >= 10:
+                        break
+
+    return min(deductions, 5), issues[:10]
+
+
+def check_efficiency(code: str, tree: ast.AST | None) -> tuple[int, list[str]]:
+    """Check for common efficiency issues. Returns (deductions, suggestions).
+
+    AST-based checks are skipped when the tree is None.
+    """
+    suggestions: list[str] = []
+    deductions = 0
+
+    # Repeated string concatenation in loop
+    if re.search(r'for\s+.*:.*\n\s+\w+\s*\+=\s*["\']', code, re.MULTILINE):
+        suggestions.append("Avoid string concatenation in loops; use ''.join() or list append instead")
+        deductions += 1
+
+    # Using list when set would work for membership tests
+    if re.search(r'if\s+\w+\s+in\s+\[', code):
+        suggestions.append("Consider using a set instead of a list for membership testing (faster lookup)")
+        deductions += 1
+
+    # Nested loops that could use comprehensions (one nested loop is enough)
+    if tree is not None:
+        has_nested = any(
+            isinstance(child, (ast.For, ast.While)) and child is not node
+            for node in ast.walk(tree)
+            if isinstance(node, (ast.For, ast.While))
+            for child in ast.walk(node)
+        )
+        if has_nested:
+            suggestions.append("Consider list comprehensions or itertools for nested loops")
+            deductions += 1
+
+    # Using range(len(...))
+    if "range(len(" in code:
+        suggestions.append("Use enumerate() instead of range(len()) for cleaner iteration")
+        deductions += 1
+
+    # Global variables (counted from the tree's top-level statements)
+    if tree is not None:
+        globals_count = sum(1 for node in ast.iter_child_nodes(tree) if isinstance(node, ast.Assign))
+        if globals_count > 3:
+            suggestions.append("Consider reducing global variables; encapsulate in functions or classes")
+            deductions += 1
+
+    return min(deductions, 3), suggestions[:5]
+
+
+def check_correctness(code: str, tree: ast.AST | None) -> tuple[int, list[str]]:
+    """Check for common correctness issues.
+
+    A None tree means the code doesn't parse; only then is it parsed again,
+    for the syntax error message.
+    """
+    issues: list[str] = []
+    deductions = 0
+
+    if tree is None:
+        return 3, [check_syntax(code)[1]]
+
+    # Check for bare except
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ExceptHandler) and node.type is None:
+            issues.append("Bare 'except:' catches all exceptions including SystemExit/KeyboardInterrupt; specify exception types")
+            deductions += 1
+            # Deductions are capped at 4 and issues at 8 - once both are
+            # full, nothing later can change the result
+            if deductions >= 4 and len(issues) >= 8:
+                return 4, issues[:8]
+
+    # Check for mutable default arguments
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            for default in node.args.defaults + node.args.kw_defaults:
+                if default and isinstance(default, (ast.List, ast.Dict, ast.Set)):
+                    issues.append(f"Function '{node.name}': mutable default argument; use None and set inside function")
+                    deductions += 1
+            if deductions >= 4 and len(issues) >= 8:
+                return 4, issues[:8]
+
+    # Check for unused imports
+    imports = set()
+    used_names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.add(alias.asname or alias.name)
+        elif isinstance(node, ast.ImportFrom):
+            for alias in node.names:
+                imports.add(alias.asname or alias.name)
+        elif isinstance(node, ast.Name):
+            used_names.add(node.id)
+
+    unused = imports - used_names
+    for name in unused:
+        issues.append(f"Import '{name}' appears unused")
+        deductions += 1
+        if deductions >= 4 and len(issues) >= 8:
+            break
+
+    return min(deductions, 4), issues[:8]
@@ -6,14 +6,21 @@ Adapts explanation depth to the student's mastery level.
 import logging
 from contextlib import asynccontextmanager
 
+import orjson
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 
+from src.api.shared.auth import close_auth_client
 from src.api.shared.schemas import ConceptRequest, ConceptResponse
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("concepts-agent")
 
+# Constant bodies for the health and Dapr subscription probes
+_HEALTH_BODY = orjson.dumps({"status": "healthy", "agent": "concepts-agent"})
+_SUBSCRIBE_BODY = b"[]"
+
 # Topic knowledge base - keyed by topic keyword
 TOPIC_EXPLANATIONS: dict[str, dict[str, list]] = {
     "variables": {
@@ -551,6 +558,30 @@ os.listdir(".")   # list files
 }
 
 
+def _render_explanations() -> dict[tuple[str, str], bytes]:
+    """Serialize every (topic, tier) response body to UTF-8 JSON once at import.
+
+    Tiers missing from a topic resolve to its beginner content, mirroring the
+    fallback in ``explain``.
+    """
+    bodies: dict[tuple[str, str], bytes] = {}
+    for topic_key, topic_data in TOPIC_EXPLANATIONS.items():
+        for tier in ("beginner", "intermediate"):
+            adapted = tier if tier in topic_data else "beginner"
+            content = topic_data[adapted]
+            bodies[(topic_key, tier)] = ConceptResponse(
+                topic=topic_key,
+                explanation=content["explanation"],
+                examples=content.get("examples", []),
+                difficulty_adapted=adapted,
+            ).model_dump_json().encode("utf-8")
+    return bodies
+
+
+# Static content is served on every request - encode it once, not per response
+EXPLANATION_BODIES = _render_explanations()
+
+
 def get_mastery_tier(mastery: int) -> str:
     """Convert mastery percentage to tier name."""
     if mastery <= 40:
@@ -589,19 +620,20 @@ def find_topic(query: str) -> str | None:
 async def lifespan(app: FastAPI):
     logger.info("Concepts Agent starting with %d topics", len(TOPIC_EXPLANATIONS))
     yield
+    await close_auth_client()
     logger.info("Concepts Agent shutting down")
 
 
 app = FastAPI(
     title="LearnFlow Concepts Agent",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 
 
-@app.post("/explain", response_model=ConceptResponse)
-async def explain(request: ConceptRequest) -> ConceptResponse:
-    """Explain a Python topic adapted to student mastery level."""
+def explanation_body(request: ConceptRequest) -> bytes:
+    """JSON body explaining the requested topic at the student's tier."""
     topic_key = find_topic(request.topic)
     if not topic_key or topic_key not in TOPIC_EXPLANATIONS:
         # Fallback generic response
@@ -611,23 +643,23 @@ async def explain(request: ConceptRequest) -> ConceptResponse:
             "Try asking about: variables, loops, lists, dicts, functions, OOP, files, errors, or libraries.",
             examples=[],
             difficulty_adapted="beginner",
-        )
+        ).model_dump_json().encode("utf-8")
 
     tier = get_mastery_tier(request.mastery_level or 0)
-    topic_data = TOPIC_EXPLANATIONS[topic_key]
+    return EXPLANATION_BODIES[(topic_key, tier)]
+
 
-    # Fall back to beginner if tier not available
-    if tier not in topic_data:
-        tier = "beginner"
+@app.post("/explain", response_model=ConceptResponse)
+async def explain(request: ConceptRequest) -> Response:
+    """Explain a Python topic adapted to student mastery level."""
+    return Response(content=explanation_body(request), media_type="application/json")
 
-    content = topic_data[tier]
 
-    return ConceptResponse(
-        topic=topic_key,
-        explanation=content["explanation"],
-        examples=content.get("examples", []),
-        difficulty_adapted=tier,
-    )
+@app.post("/batch_explain", response_model=list[ConceptResponse])
+async def batch_explain(requests: list[ConceptRequest]) -> Response:
+    """Explain several topics in one call (used by the triage micro-batcher)."""
+    body = b"[" + b",".join(explanation_body(request) for request in requests) + b"]"
+    return Response(content=body, media_type="application/json")
 
 
 class HealthResponse(BaseModel):
@@ -636,10 +668,10 @@ class HealthResponse(BaseModel):
 
 
 @app.get("/health", response_model=HealthResponse)
-async def health():
-    return HealthResponse(status="healthy", agent="concepts-agent")
+async def health() -> Response:
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
 @app.get("/dapr/subscribe")
-async def subscribe():
-    return []
+async def subscribe() -> Response:
+    return Response(content=_SUBSCRIBE_BODY, media_type="application/json")
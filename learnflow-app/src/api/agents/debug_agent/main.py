@@ -6,24 +6,47 @@ import ast
 import logging
 import re
 from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import NamedTuple
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
+from src.api.shared.auth import close_auth_client
+from src.api.shared.config import settings
 from src.api.shared.schemas import DebugRequest, DebugResponse, ErrorType
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("debug-agent")
+logger.setLevel(settings.LOG_LEVEL)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Debug Agent starting")
     yield
+    await close_auth_client()
     logger.info("Debug Agent shutting down")
 
 
-app = FastAPI(title="LearnFlow Debug Agent", version="1.0.0", lifespan=lifespan)
+app = FastAPI(
+    title="LearnFlow Debug Agent",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
+
+
+class ErrorHint(NamedTuple):
+    """Read-only diagnosis returned by detect_error_type."""
+
+    error_type: ErrorType
+    explanation: str
+    hint1: str
+    hint2: str
+    concept: str
+
 
 # Error pattern database
 ERROR_PATTERNS: dict[str, dict] = {
@@ -70,7 +93,7 @@ ERROR_PATTERNS: dict[str, dict] = {
     "NameError": {
         "type": ErrorType.RUNTIME,
         "patterns": {
-            r"name '(\w+)' is not defined": {
+            r"name '\w+' is not defined": {
                 "explanation": "You're trying to use a variable or function that Python doesn't know about.",
                 "hint1": "Check spelling - Python is case-sensitive ('Name' and 'name' are different).",
                 "hint2": "Make sure you defined/assigned the variable BEFORE using it. Also check if you need to import a module.",
@@ -87,13 +110,13 @@ ERROR_PATTERNS: dict[str, dict] = {
                 "hint2": "Common fix: use int(), str(), or float() to convert types before the operation.",
                 "concept": "Type Conversion",
             },
-            r"'(\w+)' object is not callable": {
+            r"'\w+' object is not callable": {
                 "explanation": "You're using parentheses () on something that isn't a function.",
                 "hint1": "Check if you accidentally used the same name for a variable and a function.",
                 "hint2": "Remember: parentheses mean 'call this function'. Square brackets [] are for indexing.",
                 "concept": "Functions vs Variables",
             },
-            r"takes (\d+) positional argument": {
+            r"takes \d+ positional argument": {
                 "explanation": "You're calling a function with the wrong number of arguments.",
                 "hint1": "Check the function definition to see how many parameters it expects.",
                 "hint2": "Don't forget that class methods need 'self' as the first parameter.",
@@ -143,7 +166,7 @@ ERROR_PATTERNS: dict[str, dict] = {
     "AttributeError": {
         "type": ErrorType.RUNTIME,
         "patterns": {
-            r"has no attribute '(\w+)'": {
+            r"has no attribute '\w+'": {
                 "explanation": "You're trying to use a method or attribute that doesn't exist on this object.",
                 "hint1": "Check the spelling of the method name. Use dir(object) to see available attributes.",
                 "hint2": "Make sure the variable has the type you think it does. Use type() to check.",
@@ -178,6 +201,7 @@ ERROR_PATTERNS: dict[str, dict] = {
 # Logic error patterns (detected from code analysis)
 LOGIC_PATTERNS = [
     {
+        "name": "assign",
         "pattern": r"if\s+\w+\s*=\s*\w+",
         "explanation": "Using = (assignment) instead of == (comparison) in a condition.",
         "hint1": "In conditions, use == for comparison, not = for assignment.",
@@ -185,13 +209,16 @@ LOGIC_PATTERNS = [
         "concept": "Comparison Operators",
     },
     {
-        "pattern": r"while\s+True\s*:(?!.*break)",
+        "name": "infinite_loop",
+        # Only finds the loop; detect_error_type then looks for a break
+        "pattern": r"while\s+True\s*:",
         "explanation": "Infinite loop detected - 'while True' without a visible 'break' statement.",
         "hint1": "Add a 'break' condition inside the loop to stop it at the right time.",
         "hint2": "Consider using a 'while condition:' loop instead of 'while True:' with break.",
         "concept": "While Loops",
     },
     {
+        "name": "dead_code",
         "pattern": r"return\s+.*\n\s+\S",
         "explanation": "Code exists after a return statement - it will never execute.",
         "hint1": "Any code after 'return' in the same block is unreachable.",
@@ -200,91 +227,195 @@ LOGIC_PATTERNS = [
     },
 ]
 
+# ERROR_PATTERNS flattened at import into parallel lists indexed by error:
+# the hot path works with list slots instead of nested dict lookups. Each
+# error's sub-patterns are joined into one alternation of capture groups, so
+# a single scan of the output finds the match and match.lastindex - 1 is the
+# index of its response.
+_error_names: list[str] = list(ERROR_PATTERNS)
+_error_types: list[ErrorType] = [ERROR_PATTERNS[name]["type"] for name in _error_names]
+_combined: list[re.Pattern] = [
+    re.compile("|".join(f"({pattern})" for pattern in ERROR_PATTERNS[name]["patterns"]))
+    for name in _error_names
+]
+_hints: list[tuple[ErrorHint, ...]] = [
+    tuple(
+        ErrorHint(ERROR_PATTERNS[name]["type"], r["explanation"], r["hint1"], r["hint2"], r["concept"])
+        for r in ERROR_PATTERNS[name]["patterns"].values()
+    )
+    for name in _error_names
+]
 
-def detect_error_type(code: str, error_output: str | None) -> dict:
-    """Analyze code and error output to identify the error and provide hints."""
-    # First try to parse the error output
-    if error_output:
-        for error_name, error_info in ERROR_PATTERNS.items():
-            if error_name in error_output:
-                for pattern, response in error_info["patterns"].items():
-                    if re.search(pattern, error_output):
-                        return {
-                            "error_type": error_info["type"],
-                            "explanation": response["explanation"],
-                            "hint1": response["hint1"],
-                            "hint2": response["hint2"],
-                            "concept": response["concept"],
-                        }
-                # Matched error name but not specific pattern - give generic response
-                first_response = next(iter(error_info["patterns"].values()))
-                return {
-                    "error_type": error_info["type"],
-                    "explanation": f"A {error_name} occurred in your code.",
-                    "hint1": first_response["hint1"],
-                    "hint2": "Try reading the error message carefully - it usually tells you the line number.",
-                    "concept": first_response["concept"],
-                }
+# Response for an error whose name matched but none of its patterns did
+_generic_hints: list[ErrorHint] = [
+    ErrorHint(
+        error_type=_error_types[i],
+        explanation=f"A {name} occurred in your code.",
+        hint1=_hints[i][0].hint1,
+        hint2="Try reading the error message carefully - it usually tells you the line number.",
+        concept=_hints[i][0].concept,
+    )
+    for i, name in enumerate(_error_names)
+]
 
-    # Try to detect syntax errors by parsing
+# All logic checks fused into one alternation: one scan of the code, with
+# the named group that matched selecting the check
+LOGIC_RE = re.compile("|".join(f"(?P<{lc['name']}>{lc['pattern']})" for lc in LOGIC_PATTERNS))
+LOGIC_HINTS = {
+    lc["name"]: ErrorHint(ErrorType.LOGIC, lc["explanation"], lc["hint1"], lc["hint2"], lc["concept"])
+    for lc in LOGIC_PATTERNS
+}
+
+# Any exception class name ("...Error"), looked up in a dict to find its
+# index into the lists above. One short generic pattern scans much faster
+# than an alternation of every known name; unknown names are skipped.
+ERROR_NAME_RE = re.compile(r"\b[A-Z]\w*Error\b")
+_error_index: dict[str, int] = {name: i for i, name in enumerate(_error_names)}
+
+# Regex scans are bounded so one huge paste can't stall a worker. Student
+# code is scanned from the start; error output from the end, since a
+# traceback's exception line comes last, after any program output.
+MAX_CODE_SCAN = 65536
+MAX_ERROR_SCAN = 8192
+
+
+# Returned when neither the error output nor the code points at a known error
+DEFAULT_RESPONSE = ErrorHint(
+    error_type=ErrorType.RUNTIME,
+    explanation="An error occurred in your code. Let's investigate.",
+    hint1="Add print() statements at key points to trace your code's execution.",
+    hint2="Check your variable types and values at each step - something might not be what you expect.",
+    concept="Debugging Techniques",
+)
+
+
+@lru_cache(maxsize=1024)
+def _parse(code: str) -> ast.Module | tuple[int | None, str]:
+    """Parse code once per distinct source. Returns (lineno, msg) on a syntax error."""
     try:
-        ast.parse(code)
+        return ast.parse(code)
     except SyntaxError as e:
-        return {
-            "error_type": ErrorType.SYNTAX,
-            "explanation": f"Syntax error at line {e.lineno}: {e.msg}",
-            "hint1": "Check the line mentioned and the line above it for missing colons, brackets, or quotes.",
-            "hint2": "Python's error sometimes points to the line AFTER the actual mistake.",
-            "concept": "Python Syntax",
-        }
+        return e.lineno, e.msg
+
+
+# A break inside one of these leaves that scope, not the enclosing loop
+_BREAK_SCOPES = (ast.For, ast.AsyncFor, ast.While, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+
+
+def _has_break(body: list[ast.stmt]) -> bool:
+    """Whether a loop body contains a break that exits that loop."""
+    stack: list[ast.AST] = list(body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Break):
+            return True
+        if isinstance(node, _BREAK_SCOPES):
+            # A nested loop's else clause still runs in this loop
+            if isinstance(node, (ast.For, ast.AsyncFor, ast.While)):
+                stack.extend(node.orelse)
+            continue
+        stack.extend(ast.iter_child_nodes(node))
+    return False
+
+
+def _has_endless_while_true(tree: ast.Module) -> bool:
+    """Whether some 'while True:' loop has no break of its own."""
+    return any(
+        isinstance(node, ast.While)
+        and isinstance(node.test, ast.Constant)
+        and node.test.value is True
+        and not _has_break(node.body)
+        for node in ast.walk(tree)
+    )
+
+
+@lru_cache(maxsize=2048)
+def detect_error_type(code: str, error_output: str | None) -> ErrorHint:
+    """Analyze code and error output to identify the error and provide hints.
+
+    When error output is provided the answer comes from it alone; the code is
+    only parsed and scanned for logic errors when there is no output to read.
+
+    Results are memoized on (code, error_output) - students resubmit the same
+    snippet and cohorts hit the same starter-code bugs.
+    """
+    # First try to parse the error output
+    if error_output and not error_output.isspace():
+        error_tail = error_output[-MAX_ERROR_SCAN:]
+        # The raised exception is the last one named: earlier names come from
+        # chained tracebacks ("During handling of the above exception...")
+        i = None
+        for name_match in ERROR_NAME_RE.finditer(error_tail):
+            i = _error_index.get(name_match.group(), i)
+        if i is not None:
+            match = _combined[i].search(error_tail)
+            if match:
+                return _hints[i][match.lastindex - 1]
+            # Matched error name but not specific pattern - give generic response
+            return _generic_hints[i]
+
+        # A runtime error we don't recognize - parsing the code won't help
+        return DEFAULT_RESPONSE
+
+    # Try to detect syntax errors by parsing
+    parsed = _parse(code)
+    if isinstance(parsed, tuple):
+        lineno, msg = parsed
+        return ErrorHint(
+            error_type=ErrorType.SYNTAX,
+            explanation=f"Syntax error at line {lineno}: {msg}",
+            hint1="Check the line mentioned and the line above it for missing colons, brackets, or quotes.",
+            hint2="Python's error sometimes points to the line AFTER the actual mistake.",
+            concept="Python Syntax",
+        )
 
     # Check for logic errors
-    for logic_check in LOGIC_PATTERNS:
-        if re.search(logic_check["pattern"], code):
-            return {
-                "error_type": ErrorType.LOGIC,
-                "explanation": logic_check["explanation"],
-                "hint1": logic_check["hint1"],
-                "hint2": logic_check["hint2"],
-                "concept": logic_check["concept"],
-            }
+    # The regex only finds a 'while True:'; the tree decides whether one of
+    # them lacks a break - one in a comment, a string or another loop
+    # doesn't count.
+    for logic_match in LOGIC_RE.finditer(code, 0, MAX_CODE_SCAN):
+        name = logic_match.lastgroup
+        if name == "infinite_loop" and not _has_endless_while_true(parsed):
+            continue
+        return LOGIC_HINTS[name]
 
     # Default - can't identify specific error
-    return {
-        "error_type": ErrorType.RUNTIME,
-        "explanation": "An error occurred in your code. Let's investigate.",
-        "hint1": "Add print() statements at key points to trace your code's execution.",
-        "hint2": "Check your variable types and values at each step - something might not be what you expect.",
-        "concept": "Debugging Techniques",
-    }
+    return DEFAULT_RESPONSE
 
 
 @app.post("/analyze", response_model=DebugResponse)
-async def analyze(request: DebugRequest) -> DebugResponse:
+def analyze(request: DebugRequest) -> DebugResponse:
     """Analyze code error and provide debugging hints (not solutions)."""
-    logger.info("Debugging code for student %s", request.student_id)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Debugging code for student %s", request.student_id)
 
     result = detect_error_type(request.code, request.error_output)
 
     return DebugResponse(
-        error_type=result["error_type"],
-        error_explanation=result["explanation"],
-        hint_1=result["hint1"],
-        hint_2=result["hint2"],
-        related_concept=result["concept"],
+        error_type=result.error_type,
+        error_explanation=result.explanation,
+        hint_1=result.hint1,
+        hint_2=result.hint2,
+        related_concept=result.concept,
     )
 
 
+@app.post("/batch_analyze", response_model=list[DebugResponse])
+def batch_analyze(requests: list[DebugRequest]) -> list[DebugResponse]:
+    """Analyze several requests in one call (used by the triage micro-batcher)."""
+    return [analyze(request) for request in requests]
+
+
 class HealthResponse(BaseModel):
     status: str
     agent: str
 
 
 @app.get("/health", response_model=HealthResponse)
-async def health():
+def health():
     return HealthResponse(status="healthy", agent="debug-agent")
 
 
 @app.get("/dapr/subscribe")
-async def subscribe():
+def subscribe():
     return []
@@ -3,16 +3,20 @@
 Difficulty levels: easy, medium, hard.
 Returns: exercise JSON with test cases.
 """
+import ast
 import logging
 import uuid
 from contextlib import asynccontextmanager
+from functools import lru_cache
 
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from sqlalchemy import select
 
+from src.api.shared.auth import close_auth_client
 from src.api.shared.config import TOPIC_EXERCISE_STARTED, settings
-from src.api.shared.dapr_client import publish_event
+from src.api.shared.dapr_client import close_client, publish_event
 from src.api.shared.database import get_session
 from src.api.shared.schemas import (
     Difficulty,
@@ -31,10 +35,17 @@ logger = logging.getLogger("exercise-agent")
 async def lifespan(app: FastAPI):
     logger.info("Exercise Agent starting")
     yield
+    await close_client()
+    await close_auth_client()
     logger.info("Exercise Agent shutting down")
 
 
-app = FastAPI(title="LearnFlow Exercise Agent", version="1.0.0", lifespan=lifespan)
+app = FastAPI(
+    title="LearnFlow Exercise Agent",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 # Exercise templates organized by topic keyword and difficulty
 EXERCISE_BANK: dict[str, dict[str, list[dict]]] = {
@@ -252,18 +263,48 @@ DEFAULT_EXERCISES = {
 }
 
 
+# Untouched starter code from the default exercises counts as no submission
+PLACEHOLDER_CODE: frozenset[str] = frozenset(ex["starter_code"].strip() for ex in DEFAULT_EXERCISES.values())
+
+
+def _prebuild(ex: dict) -> dict:
+    """ExerciseResponse fields for a template, with its TestCase models built once."""
+    return {
+        "title": ex["title"],
+        "description": ex["description"],
+        "starter_code": ex["starter_code"],
+        "test_cases": [TestCase(**tc) for tc in ex["test_cases"]],
+        "hints": list(ex["hints"]),
+    }
+
+
+# The banks are static, so their test cases are validated at import rather
+# than per request; handlers only add an exercise_id and the difficulty
+PREBUILT_BANK: dict[str, dict[str, list[dict]]] = {
+    topic: {difficulty: [_prebuild(ex) for ex in exercises] for difficulty, exercises in levels.items()}
+    for topic, levels in EXERCISE_BANK.items()
+}
+PREBUILT_DEFAULTS: dict[str, dict] = {
+    difficulty: _prebuild(ex) for difficulty, ex in DEFAULT_EXERCISES.items()
+}
+
+
+@lru_cache(maxsize=4096)
 def find_topic_key(topic_id: str) -> str:
-    """Find matching topic key from exercise bank. Falls back to general."""
+    """Find matching topic key from exercise bank. Falls back to general.
+
+    Topic ids map to a fixed bank key, so lookups are memoized per id.
+    """
     # In production, this would query the DB for topic name
     return "variables"
 
 
 def get_exercises(topic_key: str, difficulty: str, count: int) -> list[dict]:
-    """Retrieve exercises from the bank."""
-    topic_exercises = EXERCISE_BANK.get(topic_key, {})
+    """Retrieve prebuilt exercise templates from the bank."""
+    topic_exercises = PREBUILT_BANK.get(topic_key, {})
     available = topic_exercises.get(difficulty, [])
     if not available:
-        return [DEFAULT_EXERCISES.get(difficulty, DEFAULT_EXERCISES["easy"])] * count
+        return [PREBUILT_DEFAULTS.get(difficulty, PREBUILT_DEFAULTS["easy"])] * count
     result = []
     for i in range(count):
         result.append(available[i % len(available)])
@@ -278,36 +319,33 @@ async def generate_exercises(request: ExerciseRequest) -> list[ExerciseResponse]
     topic_key = find_topic_key(str(request.topic_id))
     raw_exercises = get_exercises(topic_key, request.difficulty.value, request.count)
 
+    # Templates were validated at import and the rest is server-built, so
+    # responses skip validation (they share the templates' lists - never
+    # mutate them). get_exercises repeats templates when count exceeds what
+    # the bank has; repeats are shallow copies with a new exercise_id.
+    built: dict[int, ExerciseResponse] = {}
     results = []
     for ex in raw_exercises:
-        exercise_id = uuid.uuid4()
-        results.append(ExerciseResponse(
-            exercise_id=exercise_id,
-            title=ex["title"],
-            description=ex["description"],
-            difficulty=request.difficulty,
-            starter_code=ex["starter_code"],
-            test_cases=[TestCase(**tc) for tc in ex["test_cases"]],
-            hints=ex["hints"],
-        ))
+        first = built.get(id(ex))
+        if first is None:
+            first = built[id(ex)] = ExerciseResponse.model_construct(exercise_id=uuid.uuid4(), difficulty=request.difficulty, **ex)
+            results.append(first)
+        else:
+            results.append(first.model_copy(update={"exercise_id": uuid.uuid4()}))
 
     return results
 
 
-@app.post("/grade", response_model=ExerciseGradeResponse)
-async def grade_submission(submission: ExerciseSubmission) -> ExerciseGradeResponse:
-    """Auto-grade a student's exercise submission."""
-    logger.info("Grading submission from student %s for exercise %s", submission.student_id, submission.exercise_id)
-
-    # Publish exercise started event
-    await publish_event(TOPIC_EXERCISE_STARTED, {
-        "student_id": str(submission.student_id),
-        "exercise_id": str(submission.exercise_id),
-    })
+@lru_cache(maxsize=1024)
+def grade_code(code: str) -> ExerciseGradeResponse:
+    """Grade stripped submission code.
 
+    Grading depends only on the code, and students resubmit the same source
+    while iterating, so results are memoized; the returned model is shared
+    and must not be mutated.
+    """
     # Basic grading: check if code compiles and has content
-    code = submission.code.strip()
-    if not code or code == "# Write your code here":
+    if not code or code in PLACEHOLDER_CODE:
         return ExerciseGradeResponse(
             passed=False,
             tests_passed=0,
@@ -317,9 +355,8 @@ async def grade_submission(submission: ExerciseSubmission) -> ExerciseGradeRespo
         )
 
     # Check syntax
-    import ast
     try:
-        ast.parse(code)
+        tree = ast.parse(code)
     except SyntaxError as e:
         return ExerciseGradeResponse(
             passed=False,
@@ -329,11 +366,20 @@ async def grade_submission(submission: ExerciseSubmission) -> ExerciseGradeRespo
             score=10,
         )
 
-    # Basic code quality scoring
-    has_function = "def " in code
+    # Basic code quality scoring - functions and print() calls come from one
+    # walk of the tree, so names in strings or comments don't count
+    has_function = has_print = False
+    for node in ast.walk(tree):
+        if not has_function and isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            has_function = True
+        elif not has_print and isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "print":
+            has_print = True
+        else:
+            continue
+        if has_function and has_print:
+            break
     has_comments = "#" in code
-    has_print = "print" in code
-    line_count = len([l for l in code.split("\n") if l.strip()])
+    line_count = sum(1 for line in code.splitlines() if line.strip())
 
     quality_score = 40  # Base for valid code
     if has_function:
@@ -359,6 +405,20 @@ async def grade_submission(submission: ExerciseSubmission) -> ExerciseGradeRespo
     )
 
 
+@app.post("/grade", response_model=ExerciseGradeResponse)
+async def grade_submission(submission: ExerciseSubmission, background_tasks: BackgroundTasks) -> ExerciseGradeResponse:
+    """Auto-grade a student's exercise submission."""
+    logger.info("Grading submission from student %s for exercise %s", submission.student_id, submission.exercise_id)
+
+    # Publish exercise started event once the response has been sent
+    background_tasks.add_task(publish_event, TOPIC_EXERCISE_STARTED, {
+        "student_id": str(submission.student_id),
+        "exercise_id": str(submission.exercise_id),
+    })
+
+    return grade_code(submission.code.strip())
+
+
 class HealthResponse(BaseModel):
     status: str
     agent: str
@@ -4,16 +4,21 @@ Mastery formula: 40% exercises + 30% quiz + 20% code_quality + 10% streak
 Mastery levels: 0-40% Beginner(Red), 41-70% Learning(Yellow), 71-90% Proficient(Green), 91-100% Mastered(Blue)
 Struggle detection: same error 3+, stuck >10min, quiz <50%, "I'm stuck", 5+ failed executions
 """
+import asyncio
 import logging
+import re
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 
-from fastapi import FastAPI
+from fastapi import BackgroundTasks, FastAPI
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from sqlalchemy import func, select
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 
+from src.api.shared.auth import close_auth_client
 from src.api.shared.config import TOPIC_STRUGGLE_DETECTED, settings
-from src.api.shared.dapr_client import publish_event
+from src.api.shared.dapr_client import close_client, publish_event
 from src.api.shared.database import get_session
 from src.api.shared.schemas import (
     MasteryLevel,
@@ -30,27 +35,32 @@ logger = logging.getLogger("progress-agent")
 async def lifespan(app: FastAPI):
     logger.info("Progress Agent starting")
     yield
+    await close_client()
+    await close_auth_client()
     logger.info("Progress Agent shutting down")
 
 
-app = FastAPI(title="LearnFlow Progress Agent", version="1.0.0", lifespan=lifespan)
+app = FastAPI(
+    title="LearnFlow Progress Agent",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 
 def calculate_mastery(exercises_done: int, quiz_score: int, code_quality: int, streak: int) -> int:
-    """Mastery = 40% exercises + 30% quiz + 20% code_quality + 10% streak."""
+    """Mastery = 40% exercises + 30% quiz + 20% code_quality + 10% streak.
+
+    Weighted in tenths with integer arithmetic, so an exact whole percentage
+    (e.g. 0.3 * 6 + 0.2 * 1 = 2) is never truncated down by float error.
+    """
     exercise_score = min(exercises_done * 10, 100)  # Cap at 100
     streak_score = min(streak * 10, 100)
-    mastery = int(
-        0.4 * exercise_score
-        + 0.3 * quiz_score
-        + 0.2 * code_quality
-        + 0.1 * streak_score
-    )
+    mastery = (4 * exercise_score + 3 * quiz_score + 2 * code_quality + streak_score) // 10
     return max(0, min(100, mastery))
 
 
-def get_mastery_level(mastery: int) -> MasteryLevel:
-    """Map mastery % to level."""
+def _level_for(mastery: int) -> MasteryLevel:
     if mastery <= 40:
         return MasteryLevel.BEGINNER
     elif mastery <= 70:
@@ -60,6 +70,15 @@ def get_mastery_level(mastery: int) -> MasteryLevel:
     return MasteryLevel.MASTERED
 
 
+# Level for every mastery % from 0 to 100
+_LEVEL_LUT: tuple[MasteryLevel, ...] = tuple(_level_for(m) for m in range(101))
+
+
+def get_mastery_level(mastery: int) -> MasteryLevel:
+    """Map mastery % to level."""
+    return _LEVEL_LUT[min(max(mastery, 0), 100)]
+
+
 @app.post("/calculate", response_model=ProgressResponse)
 async def calculate_progress(request: ProgressRequest) -> ProgressResponse:
     """Calculate mastery for all topics (or a specific topic) for a student."""
@@ -70,63 +89,74 @@ async def calculate_progress(request: ProgressRequest) -> ProgressResponse:
 
     topics_progress: list[TopicProgress] = []
     struggling: list[TopicProgress] = []
+    struggle_events = []
 
     async with get_session() as session:
-        if request.topic_id:
-            query = select(Progress).where(
-                Progress.student_id == request.student_id,
-                Progress.topic_id == request.topic_id,
+        # Topic names come back with the progress rows - one round-trip
+        # instead of a name lookup per record - and mastery is recalculated
+        # by the database for the whole result set in the same query
+        mastery_col = Progress.mastery_expression()
+        # Only indexed and INCLUDEd progress columns are read, so Postgres
+        # can answer from idx_progress_student_topic_metrics alone
+        query = (
+            select(
+                Progress.topic_id,
+                Progress.exercises_done,
+                Progress.quiz_score,
+                Progress.code_quality,
+                Progress.streak,
+                Topic.name.label("topic_name"),
+                mastery_col.label("mastery"),
             )
-        else:
-            query = select(Progress).where(Progress.student_id == request.student_id)
-
-        result = await session.execute(query)
-        records = result.scalars().all()
-
-        for record in records:
-            # Recalculate mastery
-            mastery = calculate_mastery(
-                record.exercises_done,
-                record.quiz_score,
-                record.code_quality,
-                record.streak,
-            )
-            level = get_mastery_level(mastery)
+            .outerjoin(Topic, Topic.id == Progress.topic_id)
+            .where(Progress.student_id == request.student_id)
+        )
+        if request.topic_id:
+            query = query.where(Progress.topic_id == request.topic_id)
 
-            # Get topic name
-            topic_result = await session.execute(
-                select(Topic.name).where(Topic.id == record.topic_id)
-            )
-            topic_name = topic_result.scalar_one_or_none() or "Unknown"
+        # Stream through a server-side cursor in batches rather than
+        # materializing every row up front
+        result = await session.stream(query.execution_options(yield_per=200))
+
+        async for row in result:
+            mastery = row.mastery
+            level = get_mastery_level(mastery)
+            topic_name = row.topic_name or "Unknown"
 
-            tp = TopicProgress(
-                topic_id=record.topic_id,
+            # Built from trusted DB values - no validation needed
+            tp = TopicProgress.model_construct(
+                topic_id=row.topic_id,
                 topic_name=topic_name,
                 mastery=mastery,
                 level=level,
-                exercises_done=record.exercises_done,
-                quiz_score=record.quiz_score,
-                code_quality=record.code_quality,
-                streak=record.streak,
+                exercises_done=row.exercises_done,
+                quiz_score=row.quiz_score,
+                code_quality=row.code_quality,
+                streak=row.streak,
             )
             topics_progress.append(tp)
 
-            # Struggling: mastery < 40%
-            if mastery < 40:
+            # Struggling: still in the Beginner band (0-40%)
+            if level is MasteryLevel.BEGINNER:
                 struggling.append(tp)
 
-                # Emit struggle event
-                await publish_event(TOPIC_STRUGGLE_DETECTED, {
+                # Emit struggle event (sent after the loop)
+                struggle_events.append(publish_event(TOPIC_STRUGGLE_DETECTED, {
                     "student_id": str(request.student_id),
-                    "topic_id": str(record.topic_id),
+                    "topic_id": str(row.topic_id),
                     "reason": f"Low mastery ({mastery}%) on {topic_name}",
-                })
+                }))
+
+    # Publish concurrently once the session is released; publish_event logs
+    # its own failures, which shouldn't fail the progress report
+    if struggle_events:
+        await asyncio.gather(*struggle_events, return_exceptions=True)
 
     overall = 0
     if topics_progress:
         overall = int(sum(t.mastery for t in topics_progress) / len(topics_progress))
 
-    return ProgressResponse(
+    return ProgressResponse.model_construct(
         student_id=request.student_id,
         overall_mastery=overall,
         topics=topics_progress,
@@ -156,53 +186,50 @@ async def update_progress(request: UpdateProgressRequest) -> UpdateProgressRespo
 
     from src.api.models.progress import Progress
 
-    async with get_session() as session:
-        result = await session.execute(
-            select(Progress).where(
-                Progress.student_id == request.student_id,
-                Progress.topic_id == request.topic_id,
-            )
-        )
-        record = result.scalar_one_or_none()
-
-        if not record:
-            record = Progress(
-                student_id=request.student_id,
-                topic_id=request.topic_id,
-                exercises_done=0,
-                quiz_score=0,
-                code_quality=0,
-                streak=0,
-                mastery=0,
-            )
-            session.add(record)
-
-        previous_mastery = record.mastery
-
-        if request.exercises_done is not None:
-            record.exercises_done = request.exercises_done
-        if request.quiz_score is not None:
-            record.quiz_score = request.quiz_score
-        if request.code_quality is not None:
-            record.code_quality = request.code_quality
-        if request.streak is not None:
-            record.streak = request.streak
-
-        record.mastery = calculate_mastery(
-            record.exercises_done,
-            record.quiz_score,
-            record.code_quality,
-            record.streak,
-        )
-        record.last_activity = datetime.now(timezone.utc)
+    metrics = ("exercises_done", "quiz_score", "code_quality", "streak")
+    provided = {name: getattr(request, name) for name in metrics if getattr(request, name) is not None}
+    inserted = {name: provided.get(name, 0) for name in metrics}
+    now = datetime.now(timezone.utc)
 
-        await session.flush()
+    # An upsert instead of loading and flushing the ORM object. On conflict
+    # the new mastery is computed in SQL from the provided and stored values.
+    stmt = insert(Progress).values(
+        student_id=request.student_id,
+        topic_id=request.topic_id,
+        mastery=calculate_mastery(**inserted),
+        last_activity=now,
+        **inserted,
+    )
+    columns = Progress.__table__.c
+    current = {name: stmt.excluded[name] if name in provided else columns[name] for name in metrics}
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Progress.student_id, Progress.topic_id],
+        set_={
+            **{name: stmt.excluded[name] for name in provided},
+            "mastery": Progress.mastery_expression(**current),
+            "last_activity": now,
+        },
+    ).returning(Progress.mastery)
+
+    # Lock the row before the upsert, so a concurrent update of the same
+    # (student, topic) either finished before this read or waits until this
+    # transaction commits - previous_mastery is then the value actually
+    # replaced. Only two racing first inserts can't be ordered this way
+    # (there is no row to lock yet); the second then reports 0.
+    previous_query = (
+        select(Progress.mastery)
+        .where(Progress.student_id == request.student_id, Progress.topic_id == request.topic_id)
+        .with_for_update()
+    )
+    async with get_session() as session:
+        previous_mastery = await session.scalar(previous_query)
+        mastery = await session.scalar(stmt)
 
-    level = get_mastery_level(record.mastery)
-    return UpdateProgressResponse(
-        mastery=record.mastery,
+    level = get_mastery_level(mastery)
+    return UpdateProgressResponse.model_construct(
+        mastery=mastery,
         level=level.value,
-        previous_mastery=previous_mastery,
+        previous_mastery=previous_mastery or 0,
     )
 
 
@@ -221,8 +248,13 @@ class StruggleCheckResponse(BaseModel):
     reasons: list[str]
 
 
+# Phrases that mean the student says they're stuck, as one case-insensitive
+# scan ("stuck" already covers "i'm stuck" / "im stuck")
+STRUGGLE_PHRASES_RE = re.compile(r"stuck|help me|confused|don't understand", re.IGNORECASE)
+
+
 @app.post("/check-struggle", response_model=StruggleCheckResponse)
-async def check_struggle(request: StruggleCheckRequest) -> StruggleCheckResponse:
+async def check_struggle(request: StruggleCheckRequest, background_tasks: BackgroundTasks) -> StruggleCheckResponse:
     """Check if a student is struggling based on multiple signals."""
     reasons: list[str] = []
 
@@ -239,7 +271,7 @@ async def check_struggle(request: StruggleCheckRequest) -> StruggleCheckResponse
         reasons.append(f"Quiz score below 50% ({request.quiz_score}%)")
 
     # Says "I'm stuck"
-    if request.message and any(phrase in request.message.lower() for phrase in ["i'm stuck", "im stuck", "stuck", "help me", "confused", "don't understand"]):
+    if request.message and STRUGGLE_PHRASES_RE.search(request.message):
         reasons.append("Student expressed difficulty")
 
     # 5+ failed executions
@@ -250,7 +282,8 @@ async def check_struggle(request: StruggleCheckRequest) -> StruggleCheckResponse
 
     if struggling:
         logger.warning("Struggle detected for student %s on topic %s: %s", request.student_id, request.topic_id, reasons)
-        await publish_event(TOPIC_STRUGGLE_DETECTED, {
+        # Publish once the response has been sent
+        background_tasks.add_task(publish_event, TOPIC_STRUGGLE_DETECTED, {
             "student_id": request.student_id,
             "topic_id": request.topic_id,
             "reason": "; ".join(reasons),
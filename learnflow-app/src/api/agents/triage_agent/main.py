@@ -6,75 +6,196 @@ Routing rules:
 - "fix code" / "review" patterns → Code Review Agent
 - Default → Concepts Agent
 """
+import asyncio
 import logging
 import re
 from contextlib import asynccontextmanager
+from functools import lru_cache
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
+from src.api.shared.auth import close_auth_client
 from src.api.shared.config import (
     CONCEPTS_AGENT,
     CODE_REVIEW_AGENT,
     DEBUG_AGENT,
 )
-from src.api.shared.dapr_client import invoke_agent
+from src.api.shared.dapr_client import close_client, invoke_agent, invoke_agent_batch
 from src.api.shared.schemas import TriageRequest, TriageResponse
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("triage-agent")
 
-# Routing patterns
-ERROR_PATTERNS = re.compile(
-    r"\b(error|exception|traceback|bug|crash|fail|broken|not working|wrong output)\b",
-    re.IGNORECASE,
-)
-REVIEW_PATTERNS = re.compile(
-    r"\b(fix|review|improve|refactor|check my code|code quality|pep\s?8|style)\b",
-    re.IGNORECASE,
-)
-CONCEPT_PATTERNS = re.compile(
-    r"\b(how does|what is|explain|teach|learn|understand|concept|example|show me|tutorial)\b",
-    re.IGNORECASE,
-)
-STUCK_PATTERNS = re.compile(
-    r"\b(i'?m stuck|help me|confused|don'?t understand|lost|no idea)\b",
-    re.IGNORECASE,
+# Routing keywords per category
+ROUTING_KEYWORDS = {
+    "error": r"error|exception|traceback|bug|crash|fail|broken|not working|wrong output",
+    "review": r"fix|review|improve|refactor|check my code|code quality|pep\s?8|style",
+    "concept": r"how does|what is|explain|teach|learn|understand|concept|example|show me|tutorial",
+    "stuck": r"i'?m stuck|help me|confused|don'?t understand|lost|no idea",
+}
+
+# Category bits for a single scan of the message
+ERROR, REVIEW, CONCEPT, STUCK = 1, 2, 4, 8
+_CATEGORY_BITS = {"error": ERROR, "review": REVIEW, "concept": CONCEPT, "stuck": STUCK}
+
+# Every category compiled into one regex with a named group each, so a
+# single scan classifies the message. The alternation sits in a zero-width
+# lookahead so a keyword doesn't consume text another category needs
+# (e.g. "understand" inside "don't understand").
+_ROUTING_SOURCE = "(?=" + "|".join(
+    rf"(?P<{name}>\b(?:{words})\b)" for name, words in ROUTING_KEYWORDS.items()
+) + ")"
+ROUTING_PATTERNS = re.compile(_ROUTING_SOURCE, re.IGNORECASE)
+# Same pattern for ASCII-only messages, which run on the cheaper bytes path.
+# Bytes-mode \b and case folding are ASCII-only, so anything else stays on
+# the str pattern to keep Unicode word boundaries and folding.
+ROUTING_PATTERNS_ASCII = re.compile(_ROUTING_SOURCE.encode("ascii"), re.IGNORECASE)
+
+
+# One literal that every keyword alternative above must contain. A message
+# containing none of them cannot match ROUTING_PATTERNS, so plain substring
+# checks (C-speed) settle the common no-keyword case without the regex.
+_KEYWORD_LITERALS = (
+    "error", "exception", "traceback", "bug", "crash", "fail", "broken", "working", "output",
+    "fix", "review", "improve", "refactor", "check", "quality", "pep", "style",
+    "how", "what", "explain", "teach", "learn", "understand", "concept", "example", "show", "tutorial",
+    "stuck", "help", "confused", "lost", "idea",
 )
 
+# Micro-batching: concurrent queries bound for the same agent are collected
+# for up to BATCH_MAX_WAIT seconds (or BATCH_MAX_SIZE items) and forwarded
+# in one batch_<method> call instead of one RPC each. A lone query with
+# nothing else queued or in flight is sent straight away.
+BATCH_MAX_SIZE = 32
+BATCH_MAX_WAIT = 0.005
+
+
+class MicroBatcher:
+    """Groups concurrent agent invocations into one call per agent."""
+
+    def __init__(self, max_size: int = BATCH_MAX_SIZE, max_wait: float = BATCH_MAX_WAIT):
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: asyncio.Task | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        # Fail whatever was queued but never collected, so no caller hangs
+        while not self._queue.empty():
+            *_, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Triage batcher stopped"))
+        await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    async def submit(self, agent_name: str, method: str, payload: dict) -> dict:
+        """Queue one invocation and wait for its own result.
+
+        The worker is started here if the lifespan hasn't (e.g. a TestClient
+        used outside a with block).
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((agent_name, method, payload, future))
+        return await future
+
+    def _drain(self, batch: list) -> None:
+        while len(batch) < self.max_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            self._drain(batch)
+            # Only wait for company when there is traffic to batch with
+            if len(batch) < self.max_size and (len(batch) > 1 or self._inflight):
+                await asyncio.sleep(self.max_wait)
+                self._drain(batch)
+
+            groups: dict[tuple[str, str], list] = {}
+            for agent_name, method, payload, future in batch:
+                groups.setdefault((agent_name, method), []).append((payload, future))
+            # Dispatch without waiting so the next batch can start collecting
+            for (agent_name, method), items in groups.items():
+                task = asyncio.create_task(self._dispatch(agent_name, method, items))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, agent_name: str, method: str, items: list) -> None:
+        if len(items) > 1:
+            try:
+                results = await invoke_agent_batch(agent_name, method, [payload for payload, _ in items])
+                if len(results) != len(items):
+                    raise ValueError(f"{agent_name} returned {len(results)} results for {len(items)} requests")
+            except Exception as e:
+                # e.g. an agent without batch_<method>: fall back to one call each
+                logger.warning("Batch %s/%s failed, invoking one by one: %s", agent_name, method, e)
+            else:
+                for (_, future), result in zip(items, results):
+                    if not future.done():
+                        future.set_result(result)
+                return
+        await asyncio.gather(*(self._dispatch_one(agent_name, method, payload, future) for payload, future in items))
+
+    async def _dispatch_one(self, agent_name: str, method: str, payload: dict, future: asyncio.Future) -> None:
+        try:
+            result = await invoke_agent(agent_name, method, payload)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
+
+
+batcher = MicroBatcher()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Triage Agent starting")
+    batcher.start()
     yield
+    await batcher.stop()
+    await close_client()
+    await close_auth_client()
     logger.info("Triage Agent shutting down")
 
 
 app = FastAPI(
     title="LearnFlow Triage Agent",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 
 
-def classify_query(message: str, has_code: bool) -> str:
-    """Determine which agent should handle the query."""
-    msg = message.lower().strip()
-
+def _route(found: int, has_code: bool) -> str:
+    """Pick the agent for a set of category bits."""
     # If they have code and mention errors -> debug
-    if has_code and ERROR_PATTERNS.search(msg):
+    if has_code and found & ERROR:
         return "debug"
 
     # If they mention fixing or reviewing code -> code review
-    if has_code and REVIEW_PATTERNS.search(msg):
+    if has_code and found & REVIEW:
         return "code_review"
 
     # If they're asking about concepts -> concepts
-    if CONCEPT_PATTERNS.search(msg):
+    if found & CONCEPT:
         return "concepts"
 
     # If they say they're stuck -> debug (to help them get unstuck)
-    if STUCK_PATTERNS.search(msg):
+    if found & STUCK:
         return "debug" if has_code else "concepts"
 
     # If they provide code with no specific ask -> code review
@@ -85,6 +206,54 @@ def classify_query(message: str, has_code: bool) -> str:
     return "concepts"
 
 
+# Route for every combination of category bits, indexed by found << 1 | has_code
+_ROUTES: tuple[str, ...] = tuple(
+    _route(index >> 1, bool(index & 1)) for index in range(((ERROR | REVIEW | CONCEPT | STUCK) + 1) << 1)
+)
+
+
+def _classify(message: str, has_code: bool) -> str:
+    # Literal pre-filter: no keyword at all means the default route. The
+    # message is casefold()ed rather than lower()ed so it folds at least as
+    # much as re.IGNORECASE does (e.g. "\u017f" long s -> "s").
+    folded = message.casefold()
+    if not any(literal in folded for literal in _KEYWORD_LITERALS):
+        return _ROUTES[has_code]
+
+    # One pass over the message collects every category it mentions. The
+    # scan stops early once the highest-precedence category for this request
+    # is found (errors with code, otherwise concepts). The pattern is
+    # case-insensitive and \b ignores surrounding whitespace, so the regex
+    # runs on the message as-is rather than the folded copy.
+    if message.isascii():
+        matches = ROUTING_PATTERNS_ASCII.finditer(message.encode("ascii"))
+    else:
+        matches = ROUTING_PATTERNS.finditer(message)
+    decisive = ERROR if has_code else CONCEPT
+    found = 0
+    for match in matches:
+        bit = _CATEGORY_BITS[match.lastgroup]
+        found |= bit
+        if bit == decisive:
+            break
+
+    return _ROUTES[found << 1 | has_code]
+
+
+# Retried and template messages ("I'm stuck", "how does X work") repeat
+# across students. Only short messages are cached so one long paste can't
+# push the common phrases out.
+MAX_CACHED_MESSAGE = 512
+_classify_cached = lru_cache(maxsize=4096)(_classify)
+
+
+def classify_query(message: str, has_code: bool) -> str:
+    """Determine which agent should handle the query."""
+    if len(message) <= MAX_CACHED_MESSAGE:
+        return _classify_cached(message, has_code)
+    return _classify(message, has_code)
+
+
 AGENT_MAP = {
     "debug": (DEBUG_AGENT, "analyze"),
     "code_review": (CODE_REVIEW_AGENT, "review"),
@@ -115,8 +284,9 @@ async def triage(request: TriageRequest) -> TriageResponse:
         if request.topic_id:
             payload["topic_id"] = str(request.topic_id)
 
-        result = await invoke_agent(agent_name, method, payload)
-        return TriageResponse(agent=agent_name, response=result)
+        result = await batcher.submit(agent_name, method, payload)
+        # The downstream agent already validated its own response
+        return TriageResponse.model_construct(agent=agent_name, response=result)
 
     except Exception as e:
         logger.error("Failed to invoke %s: %s", agent_name, str(e))
@@ -9,7 +9,7 @@ from contextlib import asynccontextmanager
 import httpx
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("gateway")
@@ -25,15 +25,29 @@ AGENT_URLS = {
     "code-sandbox": "http://localhost:8010",
 }
 
+# Parsed once so each proxied call only swaps in the path
+AGENT_BASES = {name: httpx.URL(url) for name, url in AGENT_URLS.items()}
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("API Gateway starting")
+    # One pooled client for all proxied calls keeps upstream connections alive
+    app.state.client = httpx.AsyncClient(
+        timeout=30.0,
+        limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+    )
     yield
+    await app.state.client.aclose()
     logger.info("API Gateway shutting down")
 
 
-app = FastAPI(title="LearnFlow API Gateway", version="1.0.0", lifespan=lifespan)
+app = FastAPI(
+    title="LearnFlow API Gateway",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -47,24 +61,31 @@ app.add_middleware(
 @app.api_route("/{agent_name}/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def proxy(agent_name: str, path: str, request: Request):
     """Proxy requests to the appropriate agent."""
-    if agent_name not in AGENT_URLS:
+    base = AGENT_BASES.get(agent_name)
+    if base is None:
         raise HTTPException(status_code=404, detail=f"Unknown agent: {agent_name}")
 
-    target_url = f"{AGENT_URLS[agent_name]}/{path}"
+    target_url = base.copy_with(path=f"/{path}")
     body = await request.body()
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.request(
-                method=request.method,
-                url=target_url,
-                content=body,
-                headers={"Content-Type": "application/json"},
-            )
-            return JSONResponse(status_code=response.status_code, content=response.json())
-        except httpx.RequestError as e:
-            logger.error("Proxy error for %s: %s", agent_name, str(e))
-            raise HTTPException(status_code=502, detail=f"Agent {agent_name} unavailable")
+    client: httpx.AsyncClient = request.app.state.client
+    try:
+        response = await client.request(
+            method=request.method,
+            url=target_url,
+            content=body,
+            headers={"Content-Type": "application/json"},
+        )
+        # Pass the agent's body through as-is instead of decoding and
+        # re-encoding it (httpx has already undone any content-encoding)
+        return Response(
+            content=response.content,
+            status_code=response.status_code,
+            media_type=response.headers.get("content-type", "application/json"),
+        )
+    except httpx.RequestError as e:
+        logger.error("Proxy error for %s: %s", agent_name, str(e))
+        raise HTTPException(status_code=502, detail=f"Agent {agent_name} unavailable")
 
 
 @app.get("/health")
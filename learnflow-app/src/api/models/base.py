@@ -1,33 +1,51 @@
 """SQLAlchemy base configuration."""
+import os
+import time
 import uuid
-from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column, DateTime, FetchedValue, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import DeclarativeBase
 
 
 class Base(DeclarativeBase):
     """Base class for all models."""
-    pass
+    # "auto": INSERTs fetch server-filled timestamps in the same statement
+    # (RETURNING, still batched via insertmanyvalues). UPDATEs skip RETURNING
+    # so multi-row flushes can use executemany; the trigger-maintained
+    # updated_at is just expired and nothing in the app reads it back.
+    __mapper_args__ = {"eager_defaults": "auto"}
 
 
 class TimestampMixin:
-    """Mixin that adds created_at and updated_at columns."""
+    """Mixin that adds created_at and updated_at columns.
+
+    Both are set by the database: now() on insert, and updated_at by the
+    set_updated_at trigger (schema.sql, or M005 for older databases) on
+    every update.
+    """
     created_at = Column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
         nullable=False,
     )
     updated_at = Column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc),
-        onupdate=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        server_onupdate=FetchedValue(),
     )
 
 
 def generate_uuid() -> uuid.UUID:
-    return uuid.uuid4()
+    """Time-ordered UUIDv7 (RFC 9562): 48-bit Unix ms timestamp + random bits.
+
+    New keys land at the right edge of the primary-key B-tree instead of on
+    random pages, which keeps inserts into the high-write tables local.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
 
 
 class UUIDMixin:
@@ -1,7 +1,5 @@
 """Chat message model."""
-from datetime import datetime, timezone
-
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, CheckConstraint, Index, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -12,6 +10,7 @@ class ChatMessage(Base, UUIDMixin):
     __tablename__ = "chat_messages"
     __table_args__ = (
         CheckConstraint("role IN ('user', 'assistant', 'system')", name="ck_chat_role"),
+        Index("idx_chat_student_created", "student_id", text("created_at DESC")),
     )
 
     student_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -19,7 +18,7 @@ class ChatMessage(Base, UUIDMixin):
     role = Column(String(50), nullable=False)
     content = Column(Text, nullable=False)
     agent_type = Column(String(100))
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     student = relationship("User", back_populates="chat_messages")
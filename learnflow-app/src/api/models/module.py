@@ -1,5 +1,5 @@
 """Module model."""
-from sqlalchemy import Column, String, Text, Integer, ForeignKey
+from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -13,10 +13,7 @@ class Module(Base, UUIDMixin):
     name = Column(String(255), nullable=False)
     description = Column(Text)
     order_index = Column(Integer, nullable=False, default=0)
-    created_at = Column(
-        __import__("sqlalchemy").DateTime(timezone=True),
-        default=lambda: __import__("datetime").datetime.now(__import__("datetime").timezone.utc),
-    )
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     class_ = relationship("Class", back_populates="modules")
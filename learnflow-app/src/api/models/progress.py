@@ -1,16 +1,28 @@
 """Progress model."""
-from datetime import datetime, timezone
-
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, DateTime, FetchedValue, ForeignKey, Index, UniqueConstraint, func, update
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
 from src.api.models.base import Base, UUIDMixin
 
+# Level and colour per mastery percentage (0-100), indexed directly
+_LEVEL_COLORS = {"beginner": "red", "learning": "yellow", "proficient": "green", "mastered": "blue"}
+_LEVELS = ("beginner",) * 41 + ("learning",) * 30 + ("proficient",) * 20 + ("mastered",) * 10
+_COLORS = tuple(_LEVEL_COLORS[level] for level in _LEVELS)
+
 
 class Progress(Base, UUIDMixin):
     __tablename__ = "progress"
-    __table_args__ = (UniqueConstraint("student_id", "topic_id", name="uq_progress_student_topic"),)
+    __table_args__ = (
+        UniqueConstraint("student_id", "topic_id", name="uq_progress_student_topic"),
+        # Covers the progress agent's lookups for index-only scans (M004)
+        Index(
+            "idx_progress_student_topic_metrics",
+            "student_id",
+            "topic_id",
+            postgresql_include=["exercises_done", "quiz_score", "code_quality", "streak", "mastery"],
+        ),
+    )
 
     student_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     topic_id = Column(UUID(as_uuid=True), ForeignKey("topics.id", ondelete="CASCADE"), nullable=False)
@@ -19,11 +31,11 @@ class Progress(Base, UUIDMixin):
     quiz_score = Column(Integer, nullable=False, default=0)
     code_quality = Column(Integer, nullable=False, default=0)
     streak = Column(Integer, nullable=False, default=0)
-    last_activity = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    last_activity = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc),
-        onupdate=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        server_onupdate=FetchedValue(),  # set_updated_at trigger (schema.sql / M005)
     )
 
     # Relationships
@@ -32,31 +44,62 @@ class Progress(Base, UUIDMixin):
 
     @property
     def mastery_level(self) -> str:
-        if self.mastery <= 40:
-            return "beginner"
-        elif self.mastery <= 70:
-            return "learning"
-        elif self.mastery <= 90:
-            return "proficient"
-        return "mastered"
+        return _LEVELS[max(0, min(100, self.mastery))]
 
     @property
     def mastery_color(self) -> str:
-        colors = {"beginner": "red", "learning": "yellow", "proficient": "green", "mastered": "blue"}
-        return colors[self.mastery_level]
+        return _COLORS[max(0, min(100, self.mastery))]
 
     def calculate_mastery(self) -> int:
         """Mastery = 40% exercises + 30% quiz + 20% code_quality + 10% streak."""
         exercise_score = min(self.exercises_done * 10, 100)
         streak_score = min(self.streak * 10, 100)
-        self.mastery = int(
-            0.4 * exercise_score
-            + 0.3 * self.quiz_score
-            + 0.2 * self.code_quality
-            + 0.1 * streak_score
-        )
+        # Weighted in tenths so whole percentages aren't lost to float error
+        self.mastery = (
+            4 * exercise_score
+            + 3 * self.quiz_score
+            + 2 * self.code_quality
+            + streak_score
+        ) // 10
         self.mastery = max(0, min(100, self.mastery))
         return self.mastery
 
+    @classmethod
+    def mastery_expression(cls, exercises_done=None, quiz_score=None, code_quality=None, streak=None):
+        """calculate_mastery as a SQL expression.
+
+        Reads this table's columns unless other column expressions are given
+        (e.g. an upsert's excluded values). On integer columns // renders as
+        Postgres integer division, which truncates where Python floors - they
+        only differ below zero, and that is clamped to 0 either way.
+        """
+        exercises_done = cls.exercises_done if exercises_done is None else exercises_done
+        quiz_score = cls.quiz_score if quiz_score is None else quiz_score
+        code_quality = cls.code_quality if code_quality is None else code_quality
+        streak = cls.streak if streak is None else streak
+        exercise_score = func.least(exercises_done * 10, 100)
+        streak_score = func.least(streak * 10, 100)
+        mastery = (
+            4 * exercise_score
+            + 3 * quiz_score
+            + 2 * code_quality
+            + streak_score
+        ) // 10
+        return func.greatest(0, func.least(100, mastery))
+
+    @classmethod
+    async def bulk_recalculate(cls, session, student_ids=None) -> int:
+        """Recompute mastery for many rows in one UPDATE; returns rows changed.
+
+        Limited to student_ids when given (e.g. a whole class), otherwise
+        every progress row. Rows already holding the right value are skipped.
+        """
+        expr = cls.mastery_expression()
+        stmt = update(cls).values(mastery=expr).where(cls.mastery != expr)
+        if student_ids is not None:
+            stmt = stmt.where(cls.student_id.in_(student_ids))
+        result = await session.execute(stmt.execution_options(synchronize_session=False))
+        return result.rowcount
+
     def __repr__(self) -> str:
         return f"<Progress student={self.student_id} mastery={self.mastery}%>"
@@ -1,7 +1,5 @@
 """Quiz and quiz result models."""
-from datetime import datetime, timezone
-
-from sqlalchemy import Column, String, Integer, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, CheckConstraint, func
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 
@@ -10,13 +8,16 @@ from src.api.models.base import Base, UUIDMixin
 
 class Quiz(Base, UUIDMixin):
     __tablename__ = "quizzes"
+    __table_args__ = (
+        CheckConstraint("difficulty IN ('easy', 'medium', 'hard')", name="ck_quiz_difficulty"),
+    )
 
     topic_id = Column(UUID(as_uuid=True), ForeignKey("topics.id", ondelete="CASCADE"), nullable=False)
     title = Column(String(255), nullable=False)
-    difficulty = Column(Enum("easy", "medium", "hard", name="difficulty_level"), nullable=False, default="medium")
+    difficulty = Column(String(16), nullable=False, default="medium")
     questions = Column(JSONB, nullable=False, default=list)
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     topic = relationship("Topic", back_populates="quizzes")
@@ -34,7 +35,7 @@ class QuizResult(Base, UUIDMixin):
     score = Column(Integer, nullable=False)
     answers = Column(JSONB, nullable=False, default=dict)
     time_taken_seconds = Column(Integer)
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     student = relationship("User", back_populates="quiz_results")
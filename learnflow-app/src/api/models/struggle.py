@@ -1,7 +1,5 @@
 """Struggle event model."""
-from datetime import datetime, timezone
-
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Index, func, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 
@@ -10,13 +8,16 @@ from src.api.models.base import Base, UUIDMixin
 
 class StruggleEvent(Base, UUIDMixin):
     __tablename__ = "struggle_events"
+    __table_args__ = (
+        Index("idx_struggle_student_unresolved", "student_id", postgresql_where=text("resolved = false")),
+    )
 
     student_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     topic_id = Column(UUID(as_uuid=True), ForeignKey("topics.id", ondelete="CASCADE"), nullable=False)
     reason = Column(String(255), nullable=False)
     details = Column(JSONB)
     resolved = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     student = relationship("User", back_populates="struggle_events")
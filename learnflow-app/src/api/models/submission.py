@@ -1,7 +1,5 @@
 """Code submission and execution result models."""
-from datetime import datetime, timezone
-
-from sqlalchemy import Column, String, Text, Boolean, Integer, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, String, Text, Boolean, Integer, DateTime, ForeignKey, CheckConstraint, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -10,13 +8,16 @@ from src.api.models.base import Base, UUIDMixin
 
 class CodeSubmission(Base, UUIDMixin):
     __tablename__ = "code_submissions"
+    __table_args__ = (
+        Index("idx_submissions_student_topic_created", "student_id", "topic_id", "created_at"),
+    )
 
     student_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     topic_id = Column(UUID(as_uuid=True), ForeignKey("topics.id", ondelete="CASCADE"), nullable=False)
     code = Column(Text, nullable=False)
     result = Column(Text)
     language = Column(String(50), default="python")
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     student = relationship("User", back_populates="submissions")
@@ -29,15 +30,21 @@ class CodeSubmission(Base, UUIDMixin):
 
 class ExecutionResult(Base, UUIDMixin):
     __tablename__ = "execution_results"
+    __table_args__ = (
+        CheckConstraint(
+            "error_type IN ('syntax', 'runtime', 'logic', 'timeout', 'memory')", name="ck_execution_error_type"
+        ),
+        Index("idx_execution_submission", "submission_id"),
+    )
 
     submission_id = Column(UUID(as_uuid=True), ForeignKey("code_submissions.id", ondelete="CASCADE"), nullable=False)
     stdout = Column(Text)
     stderr = Column(Text)
     success = Column(Boolean, nullable=False, default=False)
-    error_type = Column(Enum("syntax", "runtime", "logic", "timeout", "memory", name="error_type"))
+    error_type = Column(String(16))
     execution_time_ms = Column(Integer)
     memory_used_kb = Column(Integer)
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     submission = relationship("CodeSubmission", back_populates="execution_result")
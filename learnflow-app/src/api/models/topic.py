@@ -1,7 +1,5 @@
 """Topic model."""
-from datetime import datetime, timezone
-
-from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -15,7 +13,7 @@ class Topic(Base, UUIDMixin):
     name = Column(String(255), nullable=False)
     description = Column(Text)
     order_index = Column(Integer, nullable=False, default=0)
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     module = relationship("Module", back_populates="topics")
@@ -1,5 +1,5 @@
 """User model."""
-from sqlalchemy import Column, String, Enum, ForeignKey
+from sqlalchemy import Column, String, ForeignKey, CheckConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -8,11 +8,14 @@ from src.api.models.base import Base, UUIDMixin, TimestampMixin
 
 class User(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "users"
+    __table_args__ = (
+        CheckConstraint("role IN ('student', 'teacher')", name="ck_user_role"),
+    )
 
     name = Column(String(255), nullable=False)
     email = Column(String(255), unique=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
-    role = Column(Enum("student", "teacher", name="user_role"), nullable=False, default="student")
+    role = Column(String(16), nullable=False, default="student")
     class_id = Column(UUID(as_uuid=True), ForeignKey("classes.id", ondelete="SET NULL"), nullable=True)
 
     # Relationships
@@ -3,6 +3,7 @@
 Constraints:
 - Timeout: 5 seconds
 - Memory: 50MB
+- Output: 256KB each for stdout and stderr
 - No file system (except /tmp)
 - No network access
 - Standard library only
@@ -10,15 +11,23 @@ Constraints:
 """
 import io
 import logging
+import marshal
+import mmap
 import multiprocessing
 import os
+import re
 import resource
 import signal
 import sys
 import tempfile
+import threading
 import time
 import traceback
-from typing import Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Connection, wait
+from types import CodeType
+from typing import Any, NamedTuple
 
 logger = logging.getLogger("sandbox")
 
@@ -33,6 +42,12 @@ BLOCKED_MODULES = frozenset({
     "threading", "signal", "pathlib",
 })
 
+# A blocked module or any of its submodules, in a single match
+_BLOCKED_RE = re.compile(r"(?:" + "|".join(map(re.escape, sorted(BLOCKED_MODULES))) + r")(?:\.|$)")
+
+# Directories student code may open files in, as "dir/" prefixes
+_TMP_PREFIXES = tuple({os.path.join(d, "") for d in ("/tmp", tempfile.gettempdir())})
+
 BLOCKED_BUILTINS = frozenset({
     "exec", "eval", "compile", "__import__", "open",
     "breakpoint", "exit", "quit",
@@ -54,8 +69,9 @@ def _create_safe_builtins() -> dict:
     original_open = builtins.open
 
     def safe_open(file, mode="r", *args, **kwargs):
-        filepath = str(file)
-        if not filepath.startswith("/tmp") and not filepath.startswith(tempfile.gettempdir()):
+        # normpath so "/tmp/../etc/passwd" can't pass the prefix check
+        filepath = os.path.normpath(str(file))
+        if not filepath.startswith(_TMP_PREFIXES):
             raise PermissionError(f"File access denied: only /tmp is allowed")
         if "w" in mode or "a" in mode:
             # Limit file size
@@ -68,10 +84,123 @@ def _create_safe_builtins() -> dict:
     return safe
 
 
-def _execute_code(code: str, result_queue: multiprocessing.Queue, timeout: int, memory_mb: int):
-    """Execute code in a restricted subprocess."""
-    stdout_capture = io.StringIO()
-    stderr_capture = io.StringIO()
+def _safe_import(name, *args, **kwargs):
+    """Block dangerous imports."""
+    if _BLOCKED_RE.match(name):
+        raise ImportError(f"Module '{name}' is not allowed in the sandbox")
+    return __import__(name, *args, **kwargs)
+
+
+# Built once at import (and inherited by forked workers); each execution
+# gets a shallow copy so student code can't alter the template
+_SAFE_BUILTINS_TEMPLATE = _create_safe_builtins()
+_SAFE_BUILTINS_TEMPLATE["__import__"] = _safe_import
+
+
+# Most output a submission may print to each of stdout and stderr
+OUTPUT_LIMIT_BYTES = 256 * 1024
+
+
+class _OutputBuffer(io.RawIOBase):
+    """Byte stream over a fixed slice of the worker's shared output memory.
+
+    The memory is mapped by the parent before the fork, so printing never
+    allocates under the memory rlimit and the parent reads the bytes in
+    place instead of receiving them pickled through the pipe. Output past
+    the slice raises instead of spilling further.
+    """
+
+    def __init__(self, view: memoryview):
+        super().__init__()
+        self._view = view
+        self._len = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._len
+
+    def write(self, b) -> int:
+        data = memoryview(b).cast("B")
+        end = self._len + len(data)
+        if end > len(self._view):
+            room = len(self._view) - self._len
+            self._view[self._len:] = data[:room]
+            self._len = len(self._view)
+            raise OSError(f"Output exceeded the {len(self._view) // 1024}KB limit")
+        self._view[self._len:end] = data
+        self._len = end
+        return len(data)
+
+
+def _capture(view: memoryview) -> tuple[_OutputBuffer, io.TextIOWrapper]:
+    """A UTF-8 text stream writing straight into ``view``."""
+    buf = _OutputBuffer(view)
+    return buf, io.TextIOWrapper(buf, encoding="utf-8", errors="replace", write_through=True)
+
+
+def _read_output(result: dict[str, Any], output: mmap.mmap) -> dict[str, Any]:
+    """Swap the byte counts a worker reports for the text it left in ``output``.
+
+    ``stdout``/``stderr`` arrive as an int when they were captured into
+    shared memory, or as a str when the worker wrote the message itself.
+    """
+    with memoryview(output) as view:
+        for i, key in enumerate(("stdout", "stderr")):
+            length = result[key]
+            if isinstance(length, int):
+                start = i * OUTPUT_LIMIT_BYTES
+                result[key] = str(view[start:start + length], "utf-8", "replace")
+    return result
+
+
+# Headroom over the UID's task count taken at fork time. The count goes
+# stale while the worker waits: fill() forks replacements and the service's
+# to_thread pool grows by up to 32 threads under load. Past that, student
+# code still gets a few threads for stdlib helpers, but no fork bomb.
+EXTRA_TASKS = 64
+
+
+def _uid_task_count() -> int | None:
+    """Threads running under this UID, or None without a Linux /proc.
+
+    RLIMIT_NPROC caps everything the UID runs - the service, its threads
+    and the other workers included - so the limit is set relative to this
+    count rather than as an absolute number. Walking /proc is slow, so each
+    worker counts once, right after its fork and before any submission is
+    waiting on it; EXTRA_TASKS covers what the service starts after that.
+    """
+    uid = os.getuid()
+    try:
+        pids = os.listdir("/proc")
+    except OSError:
+        return None
+    count = 0
+    for pid in pids:
+        if not pid.isdigit():
+            continue
+        try:
+            if os.stat(f"/proc/{pid}").st_uid == uid:
+                count += len(os.listdir(f"/proc/{pid}/task"))
+        except OSError:
+            continue  # Exited while we were counting
+    return count
+
+
+def _execute_code(
+    compiled: CodeType, conn: Connection, timeout: int, memory_mb: int, output: mmap.mmap, nproc: int | None
+):
+    """Execute compiled student code in a restricted subprocess.
+
+    The result dict is sent back on ``conn``, which is closed afterwards.
+    Captured output goes into ``output`` (stdout in the first half, stderr
+    in the second) and the dict carries only its length in bytes. ``nproc``
+    is the soft RLIMIT_NPROC to apply, or None to leave it unset.
+    """
+    view = memoryview(output)
+    stdout_buf, stdout_capture = _capture(view[:OUTPUT_LIMIT_BYTES])
+    stderr_buf, stderr_capture = _capture(view[OUTPUT_LIMIT_BYTES:])
     start_time = time.time()
 
     try:
@@ -82,16 +211,22 @@ def _execute_code(code: str, result_queue: multiprocessing.Queue, timeout: int,
             resource.setrlimit(resource.RLIMIT_AS, (mem_bytes, mem_bytes))
             # CPU time limit
             resource.setrlimit(resource.RLIMIT_CPU, (timeout + 1, timeout + 2))
-            # No new processes
-            resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
-
-        # Set alarm for timeout
+            # Soft limit only: a non-root worker can't raise the hard one,
+            # so the soft limit is kept under it
+            if nproc is not None:
+                hard = resource.getrlimit(resource.RLIMIT_NPROC)[1]
+                if hard != resource.RLIM_INFINITY:
+                    nproc = min(nproc, hard)
+                resource.setrlimit(resource.RLIMIT_NPROC, (nproc, hard))
+
+        # Set a timer for the timeout (setitimer, unlike alarm, isn't
+        # rounded to whole seconds)
         def timeout_handler(signum, frame):
             raise TimeoutError("Code execution timed out")
 
         if hasattr(signal, "SIGALRM"):
             signal.signal(signal.SIGALRM, timeout_handler)
-            signal.alarm(timeout)
+            signal.setitimer(signal.ITIMER_REAL, float(timeout))
 
         # Redirect stdout/stderr
         old_stdout = sys.stdout
@@ -101,52 +236,40 @@ def _execute_code(code: str, result_queue: multiprocessing.Queue, timeout: int,
 
         try:
             # Create safe globals
-            safe_globals = _create_safe_builtins()
+            safe_globals = _SAFE_BUILTINS_TEMPLATE.copy()
             safe_globals["__builtins__"] = safe_globals
 
-            # Block dangerous imports
-            original_import = __builtins__.__import__ if hasattr(__builtins__, "__import__") else __import__
-
-            def safe_import(name, *args, **kwargs):
-                if name in BLOCKED_MODULES or any(name.startswith(m + ".") for m in BLOCKED_MODULES):
-                    raise ImportError(f"Module '{name}' is not allowed in the sandbox")
-                return original_import(name, *args, **kwargs)
-
-            safe_globals["__import__"] = safe_import
-
-            # Compile and execute
-            compiled = compile(code, "<student_code>", "exec")
             exec(compiled, safe_globals)
 
             execution_time = int((time.time() - start_time) * 1000)
 
-            result_queue.put({
-                "stdout": stdout_capture.getvalue(),
-                "stderr": stderr_capture.getvalue(),
+            conn.send({
+                "stdout": stdout_buf.tell(),
+                "stderr": stderr_buf.tell(),
                 "success": True,
                 "error_type": None,
                 "execution_time_ms": execution_time,
             })
 
         except SyntaxError as e:
-            result_queue.put({
-                "stdout": stdout_capture.getvalue(),
+            conn.send({
+                "stdout": stdout_buf.tell(),
                 "stderr": f"SyntaxError: {e.msg} (line {e.lineno})",
                 "success": False,
                 "error_type": "syntax",
                 "execution_time_ms": int((time.time() - start_time) * 1000),
             })
         except TimeoutError:
-            result_queue.put({
-                "stdout": stdout_capture.getvalue(),
+            conn.send({
+                "stdout": stdout_buf.tell(),
                 "stderr": f"TimeoutError: Code exceeded {timeout} second time limit",
                 "success": False,
                 "error_type": "timeout",
                 "execution_time_ms": timeout * 1000,
             })
         except MemoryError:
-            result_queue.put({
-                "stdout": stdout_capture.getvalue(),
+            conn.send({
+                "stdout": stdout_buf.tell(),
                 "stderr": f"MemoryError: Code exceeded {memory_mb}MB memory limit",
                 "success": False,
                 "error_type": "memory",
@@ -155,8 +278,8 @@ def _execute_code(code: str, result_queue: multiprocessing.Queue, timeout: int,
         except Exception as e:
             error_tb = traceback.format_exc()
             error_type = "runtime"
-            result_queue.put({
-                "stdout": stdout_capture.getvalue(),
+            conn.send({
+                "stdout": stdout_buf.tell(),
                 "stderr": error_tb,
                 "success": False,
                 "error_type": error_type,
@@ -166,16 +289,169 @@ def _execute_code(code: str, result_queue: multiprocessing.Queue, timeout: int,
             sys.stdout = old_stdout
             sys.stderr = old_stderr
             if hasattr(signal, "SIGALRM"):
-                signal.alarm(0)
+                signal.setitimer(signal.ITIMER_REAL, 0)
 
     except Exception as e:
-        result_queue.put({
+        conn.send({
             "stdout": "",
             "stderr": str(e),
             "success": False,
             "error_type": "runtime",
             "execution_time_ms": int((time.time() - start_time) * 1000),
         })
+    finally:
+        conn.close()
+
+
+# How long past the timeout to wait for a worker's own result
+RESULT_GRACE_SECONDS = 0.2
+
+# Fork keeps the parent's imports warm in every worker
+_ctx = multiprocessing.get_context("fork")
+
+
+def _worker_main(conn: Connection, output: mmap.mmap):
+    """Pre-forked worker: wait for one submission, run it, then exit.
+
+    The task arrives and the result leaves on the same pipe - a plain
+    send/recv pair with no feeder thread or semaphore, unlike a Queue.
+    """
+    # The fork copied the parent's end of every live worker's pipe and
+    # output map - waiting or running, this one's included. Close them all
+    # (keeping only this worker's own map) so student code can't read or
+    # forge another submission's result.
+    for worker in _live_workers:
+        worker.conn.close()
+        if worker.output is not output:
+            worker.output.close()
+    # Counted while idle, so no submission waits on the /proc walk
+    tasks = _uid_task_count()
+    nproc = None if tasks is None else tasks + EXTRA_TASKS
+    try:
+        timeout, memory_mb = conn.recv()
+        code_bytes = conn.recv_bytes()
+    except EOFError:
+        conn.close()
+        return  # Pool shut down before this worker was used
+    # marshal.loads is unsafe on untrusted bytes, but these come from the
+    # parent's own compile() over the pipe, never from the student
+    _execute_code(marshal.loads(code_bytes), conn, timeout, memory_mb, output, nproc)
+
+
+class _Worker(NamedTuple):
+    process: multiprocessing.Process
+    conn: Connection
+    # Shared with the worker: captured stdout, then stderr
+    output: mmap.mmap
+
+    def close(self) -> None:
+        self.conn.close()
+        self.output.close()
+
+
+# Every worker, in any pool, whose parent-side handles are still open -
+# waiting or in flight. Forks and closes both hold _fork_lock, so each new
+# child sees exactly the handles it inherited.
+_live_workers: set[_Worker] = set()
+_fork_lock = threading.Lock()
+
+# Every fork runs on this one thread. Request threads (execute_sandboxed
+# runs under asyncio.to_thread) only send, wait and read, so a fork never
+# copies a request thread mid-way through its own work.
+_forker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sandbox-fork")
+
+
+class SandboxPool:
+    """A few sandbox processes forked ahead of time, each used exactly once.
+
+    Workers are never reused, so rlimits and whatever state student code
+    leaves behind die with the process. Only the fork moves: it happens
+    before a submission arrives (or while the previous one runs) instead of
+    on the request path, and always on the _forker thread.
+    """
+
+    def __init__(self, size: int = 4):
+        self.size = size
+        self._ready: deque[_Worker] = deque()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _spawn(self) -> _Worker:
+        """Fork one worker. Runs on the _forker thread only."""
+        with _fork_lock:
+            conn, child_conn = _ctx.Pipe()
+            output = mmap.mmap(-1, 2 * OUTPUT_LIMIT_BYTES)
+            process = _ctx.Process(target=_worker_main, args=(child_conn, output), daemon=True)
+            worker = _Worker(process, conn, output)
+            _live_workers.add(worker)
+            process.start()
+            child_conn.close()
+        return worker
+
+    def release(self, worker: _Worker) -> None:
+        """Close the parent's handles for a finished (or dead) worker."""
+        with _fork_lock:
+            _live_workers.discard(worker)
+            worker.close()
+
+    def _fill(self) -> None:
+        while True:
+            with self._lock:
+                if self._closed or len(self._ready) >= self.size:
+                    return
+            worker = self._spawn()
+            with self._lock:
+                self._ready.append(worker)
+
+    def fill(self) -> None:
+        """Fork workers until `size` are waiting; returns once they are."""
+        _forker.submit(self._fill).result()
+
+    def refill(self) -> None:
+        """Queue a fill on the _forker thread without waiting for it."""
+        _forker.submit(self._fill)
+
+    def acquire(self) -> _Worker:
+        """Take a ready worker, forking one on the spot if none is left."""
+        while True:
+            with self._lock:
+                worker = self._ready.popleft() if self._ready else None
+            if worker is None:
+                return _forker.submit(self._spawn).result()
+            if worker.process.is_alive():
+                return worker
+            self.release(worker)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            workers, self._ready = list(self._ready), deque()
+        # Idle workers hold no work, so there is nothing to wait for
+        for worker in workers:
+            worker.process.kill()
+            self.release(worker)
+        for worker in workers:
+            worker.process.join(timeout=1)
+
+
+_pool: SandboxPool | None = None
+
+
+def get_pool() -> SandboxPool:
+    """Shared worker pool, created and filled on first use."""
+    global _pool
+    if _pool is None:
+        _pool = SandboxPool()
+        _pool.fill()
+    return _pool
+
+
+def close_pool() -> None:
+    """Stop idle workers. Call from the service's lifespan on shutdown."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
 
 
 def execute_sandboxed(code: str, timeout: int = 5, memory_mb: int = 50) -> dict[str, Any]:
@@ -189,14 +465,57 @@ def execute_sandboxed(code: str, timeout: int = 5, memory_mb: int = 50) -> dict[
     Returns:
         Dict with stdout, stderr, success, error_type, execution_time_ms
     """
-    result_queue = multiprocessing.Queue()
+    # Compile here so syntax errors never reach a worker; code objects
+    # don't pickle, so the worker gets the marshalled form
+    start_time = time.time()
+    try:
+        compiled = compile(code, "<student_code>", "exec")
+    except SyntaxError as e:
+        return {
+            "stdout": "",
+            "stderr": f"SyntaxError: {e.msg} (line {e.lineno})",
+            "success": False,
+            "error_type": "syntax",
+            "execution_time_ms": int((time.time() - start_time) * 1000),
+        }
+    except (RecursionError, MemoryError) as e:
+        # Expressions nested too deeply for the compiler
+        return {
+            "stdout": "",
+            "stderr": f"{type(e).__name__}: {e}",
+            "success": False,
+            "error_type": "runtime",
+            "execution_time_ms": int((time.time() - start_time) * 1000),
+        }
 
-    process = multiprocessing.Process(
-        target=_execute_code,
-        args=(code, result_queue, timeout, memory_mb),
-    )
-    process.start()
-    process.join(timeout=timeout + 2)  # Extra buffer for process startup
+    pool = get_pool()
+    worker = pool.acquire()
+    process, conn = worker.process, worker.conn
+    # Limits go pickled, the code as a raw message so its bytes aren't
+    # copied into a pickle stream on the way
+    conn.send((timeout, memory_mb))
+    conn.send_bytes(marshal.dumps(compiled))
+    # Fork the replacement while this submission runs
+    pool.refill()
+
+    result = None
+    try:
+        # Wake the moment a result arrives or the worker exits. The exit
+        # sentinel matters because EOF on the pipe alone isn't guaranteed:
+        # a worker forked concurrently may still hold a copy of this one's
+        # end. The worker's own timer fires on time, so only a short grace
+        # period is needed for it to report a timeout.
+        ready = wait([conn, process.sentinel], timeout + RESULT_GRACE_SECONDS)
+        # A worker that sent its result and exited can report both
+        if conn in ready or (ready and conn.poll(0)):
+            result = _read_output(conn.recv(), worker.output)
+    except EOFError:
+        pass
+    finally:
+        pool.release(worker)
+
+    if result is not None:
+        return result
 
     if process.is_alive():
         process.kill()
@@ -209,9 +528,6 @@ def execute_sandboxed(code: str, timeout: int = 5, memory_mb: int = 50) -> dict[
             "execution_time_ms": timeout * 1000,
         }
 
-    if not result_queue.empty():
-        return result_queue.get()
-
     return {
         "stdout": "",
         "stderr": "Execution failed: no result returned",
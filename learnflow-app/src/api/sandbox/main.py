@@ -3,20 +3,40 @@
 MCP-compatible code execution server.
 Timeout: 5s, Memory: 50MB, No filesystem (except /tmp), No network, Stdlib only.
 """
+import asyncio
 import logging
+import os
+import re
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 
+from src.api.sandbox.executor import close_pool, execute_sandboxed, get_pool
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("sandbox")
 
+# Obviously dangerous patterns, rejected before the code reaches a worker.
+# One case-insensitive pass instead of lowercasing and scanning per pattern.
+DANGEROUS_PATTERNS = re.compile(
+    r"import\s+(?:os|subprocess|socket|shutil)\b|__import__|eval\(|exec\(|compile\(",
+    re.IGNORECASE,
+)
+
+# Submissions running at once; the rest wait here rather than piling up
+# threads and forked workers that would only fight over the same CPUs
+MAX_CONCURRENT_EXECUTIONS = 2 * (os.cpu_count() or 1)
+_execution_slots = asyncio.Semaphore(MAX_CONCURRENT_EXECUTIONS)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Code Sandbox starting (timeout=5s, memory=50MB)")
+    get_pool()  # Fork the first workers before any request arrives
     yield
+    close_pool()
     logger.info("Code Sandbox shutting down")
 
 
@@ -24,6 +44,7 @@ app = FastAPI(
     title="LearnFlow Code Sandbox",
     version="1.0.0",
     description="Secure Python code execution sandbox for LearnFlow",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 
@@ -49,23 +70,27 @@ async def execute_code(request: ExecuteRequest) -> ExecuteResponse:
                 len(request.code), request.timeout, request.memory_mb)
 
     # Validate code doesn't contain obviously dangerous patterns
-    dangerous = ["import os", "import subprocess", "import socket", "import shutil",
-                 "__import__", "eval(", "exec(", "compile("]
-    code_lower = request.code.lower()
-    for pattern in dangerous:
-        if pattern.lower() in code_lower:
-            return ExecuteResponse(
-                stdout="",
-                stderr=f"SecurityError: '{pattern}' is not allowed in the sandbox",
-                success=False,
-                error_type="runtime",
-                execution_time_ms=0,
-            )
+    match = DANGEROUS_PATTERNS.search(request.code)
+    if match:
+        return ExecuteResponse(
+            stdout="",
+            stderr=f"SecurityError: '{match.group(0)}' is not allowed in the sandbox",
+            success=False,
+            error_type="runtime",
+            execution_time_ms=0,
+        )
 
     try:
-        from src.api.sandbox.executor import execute_sandboxed
-        result = execute_sandboxed(request.code, request.timeout, request.memory_mb)
-        return ExecuteResponse(**result)
+        # execute_sandboxed blocks until the worker finishes, so run it in a
+        # thread and keep the event loop free for other requests. That thread
+        # only waits; replacement workers are forked on the pool's own thread.
+        async with _execution_slots:
+            result = await asyncio.to_thread(
+                execute_sandboxed, request.code, request.timeout, request.memory_mb,
+            )
+        # Executor results always carry exactly these fields with the right
+        # types (see test_sandbox.py), so skip re-validating them
+        return ExecuteResponse.model_construct(**result)
     except Exception as e:
         logger.error("Sandbox execution error: %s", str(e))
         return ExecuteResponse(
@@ -3,8 +3,12 @@
 Provides token verification and user extraction for protected endpoints.
 Works with Better Auth session tokens passed as Bearer tokens.
 """
+import asyncio
+import hashlib
 import os
+import time
 from functools import wraps
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 from typing import Optional
 from uuid import UUID
 
@@ -19,6 +23,31 @@ security = HTTPBearer(auto_error=False)
 # Better Auth server URL (Next.js app)
 BETTER_AUTH_URL = os.getenv("BETTER_AUTH_URL", "http://localhost:3000")
 
+_client: httpx.AsyncClient | None = None
+
+
+def get_auth_client() -> httpx.AsyncClient:
+    """Shared keep-alive client for the Better Auth server, created on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=BETTER_AUTH_URL,
+            timeout=10.0,
+            # The client is shared across users: never store Set-Cookie
+            # from one verification and replay it on the next
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+            limits=httpx.Limits(max_keepalive_connections=32),
+        )
+    return _client
+
+
+async def close_auth_client() -> None:
+    """Close the shared client. Call from the service's lifespan on shutdown."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
 class AuthenticatedUser(BaseModel):
     """Represents an authenticated user from the session."""
@@ -30,11 +59,38 @@ class AuthenticatedUser(BaseModel):
     email_verified: bool = False
 
 
+# Successful verifications are reused for TOKEN_CACHE_TTL seconds, so a
+# signed-out session can stay usable for up to that long. Failures are never
+# cached. Keys are token digests, so raw tokens aren't kept in memory.
+TOKEN_CACHE_TTL = 60.0
+TOKEN_CACHE_MAX = 10_000
+_token_cache: dict[bytes, tuple[float, AuthenticatedUser]] = {}
+# Lookups in flight, so concurrent requests with the same token share one
+_inflight: dict[bytes, asyncio.Task] = {}
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def _cache_user(key: bytes, user: AuthenticatedUser, now: float) -> None:
+    # Constant TTL keeps insertion order == expiry order, so expired and
+    # overflow entries are always at the front
+    _token_cache.pop(key, None)
+    while _token_cache:
+        oldest = next(iter(_token_cache))
+        if len(_token_cache) < TOKEN_CACHE_MAX and _token_cache[oldest][0] > now:
+            break
+        del _token_cache[oldest]
+    _token_cache[key] = (now + TOKEN_CACHE_TTL, user)
+
+
 async def verify_token(token: str) -> Optional[AuthenticatedUser]:
     """Verify a Bearer token with the Better Auth server.
 
     Makes a request to the Better Auth session endpoint to validate
-    the token and retrieve user information.
+    the token and retrieve user information. Valid tokens are cached
+    for TOKEN_CACHE_TTL seconds.
 
     Args:
         token: The Bearer token to verify
@@ -42,32 +98,59 @@ async def verify_token(token: str) -> Optional[AuthenticatedUser]:
     Returns:
         AuthenticatedUser if valid, None if invalid
     """
+    key = _token_key(token)
+    now = time.monotonic()
+    cached = _token_cache.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_verify_uncached(key, token))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # shield: a caller disconnecting must not cancel the others' lookup
+    return await asyncio.shield(task)
+
+
+async def _verify_uncached(key: bytes, token: str) -> Optional[AuthenticatedUser]:
+    user = await _fetch_session_user(token)
+    if user is not None:
+        _cache_user(key, user, time.monotonic())
+    return user
+
+
+async def _fetch_session_user(token: str) -> Optional[AuthenticatedUser]:
+    """Look the token up on the Better Auth session endpoint."""
     try:
-        async with httpx.AsyncClient() as client:
-            # Call Better Auth's session endpoint
-            response = await client.get(
-                f"{BETTER_AUTH_URL}/api/auth/session",
-                headers={"Authorization": f"Bearer {token}"},
-                cookies={"better-auth.session_token": token},
-                timeout=10.0,
-            )
+        # Call Better Auth's session endpoint. The session cookie is set as
+        # an explicit header (per-request cookies= is deprecated in httpx).
+        response = await get_auth_client().get(
+            "/api/auth/session",
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Cookie": f"better-auth.session_token={token}",
+            },
+        )
 
-            if response.status_code != 200:
-                return None
-
-            data = response.json()
-            if not data or "user" not in data:
-                return None
-
-            user_data = data["user"]
-            return AuthenticatedUser(
-                id=UUID(user_data["id"]),
-                email=user_data["email"],
-                name=user_data["name"],
-                role=user_data.get("role", "student"),
-                image=user_data.get("image"),
-                email_verified=user_data.get("emailVerified", False),
-            )
+        if response.status_code != 200:
+            return None
+
+        data = response.json()
+        if not data or "user" not in data:
+            return None
+
+        user_data = data["user"]
+        # The id string goes straight to pydantic-core's UUID parser rather
+        # than through uuid.UUID.__init__ and then validated a second time
+        return AuthenticatedUser(
+            id=user_data["id"],
+            email=user_data["email"],
+            name=user_data["name"],
+            role=user_data.get("role", "student"),
+            image=user_data.get("image"),
+            email_verified=user_data.get("emailVerified", False),
+        )
     except Exception:
         return None
 
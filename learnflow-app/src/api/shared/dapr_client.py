@@ -1,4 +1,5 @@
 """Dapr HTTP client for service invocation and pub/sub."""
+import asyncio
 import logging
 from typing import Any
 
@@ -10,50 +11,119 @@ logger = logging.getLogger(__name__)
 
 DAPR_BASE_URL = f"http://localhost:{settings.DAPR_HTTP_PORT}/v1.0"
 
+_client: httpx.AsyncClient | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Shared keep-alive client for the Dapr sidecar, created on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            # The sidecar is on localhost - fail fast if it isn't listening
+            timeout=httpx.Timeout(10.0, connect=1.0),
+            limits=httpx.Limits(max_keepalive_connections=32),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client. Call from the agent's lifespan on shutdown."""
+    global _client
+    if _state_flush is not None:
+        # Don't drop writes still waiting for their batch
+        await asyncio.gather(_state_flush, return_exceptions=True)
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def _invoke(agent_name: str, method: str, data: Any) -> Any:
+    url = f"{DAPR_BASE_URL}/invoke/{agent_name}/method/{method}"
+    try:
+        response = await get_client().post(url, json=data, timeout=30.0)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        logger.error("Agent invocation failed: %s %s -> %d", agent_name, method, e.response.status_code)
+        raise
+    except httpx.RequestError as e:
+        logger.error("Agent invocation error: %s %s -> %s", agent_name, method, str(e))
+        raise
+
 
 async def invoke_agent(agent_name: str, method: str, data: dict[str, Any]) -> dict[str, Any]:
     """Invoke another agent via Dapr service invocation."""
-    url = f"{DAPR_BASE_URL}/invoke/{agent_name}/method/{method}"
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.post(url, json=data)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error("Agent invocation failed: %s %s -> %d", agent_name, method, e.response.status_code)
-            raise
-        except httpx.RequestError as e:
-            logger.error("Agent invocation error: %s %s -> %s", agent_name, method, str(e))
-            raise
+    return await _invoke(agent_name, method, data)
+
+
+async def invoke_agent_batch(agent_name: str, method: str, items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Invoke an agent's batch_<method> endpoint with several payloads at once.
+
+    Results come back in the same order as ``items``.
+    """
+    return await _invoke(agent_name, f"batch_{method}", items)
 
 
 async def publish_event(topic: str, data: dict[str, Any]) -> None:
     """Publish an event to a Kafka topic via Dapr pub/sub."""
     url = f"{DAPR_BASE_URL}/publish/{settings.PUBSUB_NAME}/{topic}"
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            response = await client.post(url, json=data)
-            response.raise_for_status()
-            logger.info("Published event to %s", topic)
-        except httpx.HTTPError as e:
-            logger.error("Failed to publish to %s: %s", topic, str(e))
-            raise
+    try:
+        response = await get_client().post(url, json=data)
+        response.raise_for_status()
+        logger.info("Published event to %s", topic)
+    except httpx.HTTPError as e:
+        logger.error("Failed to publish to %s: %s", topic, str(e))
+        raise
 
 
 async def get_state(key: str) -> Any | None:
     """Get state from Dapr state store."""
     url = f"{DAPR_BASE_URL}/state/{settings.STATE_STORE_NAME}/{key}"
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.get(url)
-        if response.status_code == 204:
-            return None
-        response.raise_for_status()
-        return response.json()
+    response = await get_client().get(url)
+    if response.status_code == 204:
+        return None
+    response.raise_for_status()
+    return response.json()
 
 
-async def save_state(key: str, value: Any) -> None:
-    """Save state to Dapr state store."""
+# How long save_state waits for more writes to share its request
+STATE_FLUSH_DELAY = 0.010
+
+# Writes waiting for the next flush; a later write to a key replaces the
+# earlier one, since only the last value would survive anyway
+_pending_state: dict[str, Any] = {}
+_state_flush: asyncio.Task | None = None
+
+
+async def _post_state(items: list[dict[str, Any]]) -> None:
     url = f"{DAPR_BASE_URL}/state/{settings.STATE_STORE_NAME}"
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.post(url, json=[{"key": key, "value": value}])
-        response.raise_for_status()
+    response = await get_client().post(url, json=items)
+    response.raise_for_status()
+
+
+async def _flush_state() -> None:
+    global _pending_state, _state_flush
+    await asyncio.sleep(STATE_FLUSH_DELAY)
+    items, _pending_state = _pending_state, {}
+    _state_flush = None
+    await _post_state([{"key": key, "value": value} for key, value in items.items()])
+
+
+async def save_state(key: str, value: Any) -> None:
+    """Save state to Dapr state store.
+
+    Writes made within STATE_FLUSH_DELAY of each other go out as one bulk
+    request (the state API takes a list). Returns once that request has
+    succeeded, and raises if it failed.
+    """
+    global _state_flush
+    _pending_state[key] = value
+    if _state_flush is None:
+        _state_flush = asyncio.create_task(_flush_state())
+    # Shielded so one cancelled caller doesn't drop everyone's writes
+    await asyncio.shield(_state_flush)
+
+
+async def save_state_now(key: str, value: Any) -> None:
+    """Save state immediately, without waiting to batch with other writes."""
+    await _post_state([{"key": key, "value": value}])
@@ -4,6 +4,7 @@ from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 
 from src.api.shared.config import settings
 
@@ -11,7 +12,27 @@ logger = logging.getLogger(__name__)
 
 # Convert sync URL to async
 _async_url = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
-engine = create_async_engine(_async_url, pool_size=10, max_overflow=20, echo=False)
+if settings.DB_PGBOUNCER:
+    # PgBouncer already pools server connections, so don't pool twice. Its
+    # transaction mode can hand each transaction a different backend, so
+    # prepared statements must not be cached across them.
+    engine = create_async_engine(
+        _async_url,
+        poolclass=NullPool,
+        connect_args={"statement_cache_size": 0, "prepared_statement_cache_size": 0},
+        echo=False,
+    )
+else:
+    # Recycle before typical server/load-balancer idle timeouts; pre-ping
+    # stays off so checkouts don't pay a "SELECT 1" round-trip
+    engine = create_async_engine(
+        _async_url,
+        pool_size=10,
+        max_overflow=20,
+        pool_recycle=600,
+        pool_pre_ping=False,
+        echo=False,
+    )
 async_session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
@@ -24,8 +45,6 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         except Exception:
             await session.rollback()
             raise
-        finally:
-            await session.close()
 
 
 @asynccontextmanager
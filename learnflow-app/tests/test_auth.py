@@ -0,0 +1,62 @@
+"""Tests for Better Auth token verification caching."""
+import asyncio
+from uuid import uuid4
+
+import pytest
+from src.api.shared import auth
+from src.api.shared.auth import AuthenticatedUser
+
+
+@pytest.fixture
+def fake_session(monkeypatch):
+    """Replace the Better Auth round-trip; returns the list of looked-up tokens."""
+    calls = []
+
+    async def fetch(token):
+        calls.append(token)
+        await asyncio.sleep(0)
+        if token == "bad":
+            return None
+        return AuthenticatedUser(id=uuid4(), email="s@example.com", name="Student")
+
+    monkeypatch.setattr(auth, "_fetch_session_user", fetch)
+    monkeypatch.setattr(auth, "_token_cache", {})
+    monkeypatch.setattr(auth, "_inflight", {})
+    return calls
+
+
+class TestVerifyTokenCache:
+    def test_valid_token_is_cached(self, fake_session):
+        first = asyncio.run(auth.verify_token("good"))
+        second = asyncio.run(auth.verify_token("good"))
+        assert first is second
+        assert fake_session == ["good"]
+
+    def test_invalid_token_is_not_cached(self, fake_session):
+        assert asyncio.run(auth.verify_token("bad")) is None
+        assert asyncio.run(auth.verify_token("bad")) is None
+        assert fake_session == ["bad", "bad"]
+
+    def test_expired_entry_is_refetched(self, fake_session, monkeypatch):
+        asyncio.run(auth.verify_token("good"))
+        monkeypatch.setattr(auth, "TOKEN_CACHE_TTL", 0.0)
+        auth._token_cache.clear()
+        asyncio.run(auth.verify_token("good"))
+        asyncio.run(auth.verify_token("good"))
+        assert fake_session == ["good", "good", "good"]
+
+    def test_cache_is_bounded(self, fake_session, monkeypatch):
+        monkeypatch.setattr(auth, "TOKEN_CACHE_MAX", 2)
+        for token in ("a", "b", "c"):
+            asyncio.run(auth.verify_token(token))
+        assert len(auth._token_cache) == 2
+        assert auth._token_key("a") not in auth._token_cache
+
+    def test_concurrent_lookups_share_one_request(self, fake_session):
+        async def burst():
+            return await asyncio.gather(*(auth.verify_token("good") for _ in range(5)))
+
+        users = asyncio.run(burst())
+        assert all(user is users[0] for user in users)
+        assert fake_session == ["good"]
+        assert auth._inflight == {}
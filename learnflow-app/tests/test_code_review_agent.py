@@ -1,6 +1,6 @@
 """Tests for Code Review Agent analysis logic."""
 import pytest
-from src.api.agents.code_review_agent.main import check_syntax, check_style, check_efficiency, check_correctness
+from src.api.agents.code_review_agent.analysis import check_syntax, check_style, check_efficiency, check_correctness, parse_code
 
 
 class TestSyntaxCheck:
@@ -14,48 +14,88 @@ class TestSyntaxCheck:
         assert "Syntax error" in msg
 
 
+class TestParseCode:
+    def test_valid_code(self):
+        assert parse_code("x = 1") is not None
+
+    def test_syntax_error(self):
+        assert parse_code("def foo(\n") is None
+
+
 class TestStyleCheck:
     def test_long_lines(self):
         code = "x = " + "a" * 80
-        deductions, issues = check_style(code)
+        deductions, issues = check_style(code, parse_code(code))
         assert deductions >= 1
         assert any("79 characters" in i for i in issues)
 
     def test_clean_code(self):
         code = "x = 1\ny = 2\nprint(x + y)\n"
-        deductions, issues = check_style(code)
+        deductions, issues = check_style(code, parse_code(code))
         assert deductions == 0
 
     def test_tab_indentation(self):
         code = "def foo():\n\treturn 1"
-        deductions, issues = check_style(code)
+        deductions, issues = check_style(code, parse_code(code))
         assert any("tabs" in i.lower() for i in issues)
 
+    def test_naming_skipped_without_tree(self):
+        code = "def BadName():\n    pass\n"
+        _, issues = check_style(code, None)
+        assert not any("snake_case" in i for i in issues)
+        _, issues = check_style(code, parse_code(code))
+        assert any("snake_case" in i for i in issues)
+
+
+    def test_reports_issues_past_the_deduction_cap(self):
+        code = "\n".join(f"x{i} = 1   " for i in range(12))
+        deductions, issues = check_style(code, parse_code(code))
+        assert deductions == 5
+        assert len(issues) == 10
+
 
 class TestEfficiencyCheck:
     def test_range_len_detected(self):
         code = "for i in range(len(items)):\n    print(items[i])"
-        deductions, suggestions = check_efficiency(code)
+        deductions, suggestions = check_efficiency(code, parse_code(code))
         assert any("enumerate" in s for s in suggestions)
 
     def test_set_membership(self):
         code = "if x in [1, 2, 3]:\n    pass"
-        deductions, suggestions = check_efficiency(code)
+        deductions, suggestions = check_efficiency(code, parse_code(code))
         assert any("set" in s for s in suggestions)
 
+    def test_many_globals(self):
+        code = "a = 1\nb = 2\nc = 3\nd = 4\nprint(a, b, c, d)"
+        deductions, suggestions = check_efficiency(code, parse_code(code))
+        assert any("global variables" in s for s in suggestions)
+
 
 class TestCorrectnessCheck:
     def test_bare_except(self):
         code = "try:\n    x = 1\nexcept:\n    pass"
-        deductions, issues = check_correctness(code)
+        deductions, issues = check_correctness(code, parse_code(code))
         assert any("Bare" in i for i in issues)
 
     def test_mutable_default(self):
         code = "def foo(items=[]):\n    items.append(1)\n    return items"
-        deductions, issues = check_correctness(code)
+        deductions, issues = check_correctness(code, parse_code(code))
         assert any("mutable default" in i for i in issues)
 
     def test_clean_code(self):
         code = "def add(a, b):\n    return a + b\n\nresult = add(1, 2)\nprint(result)"
-        deductions, issues = check_correctness(code)
+        deductions, issues = check_correctness(code, parse_code(code))
         assert deductions == 0
+
+    def test_reports_issues_past_the_deduction_cap(self):
+        code = "try:\n    pass\nexcept:\n    pass\n" * 5 + "import os\nimport re\nimport sys\n"
+        deductions, issues = check_correctness(code, parse_code(code))
+        assert deductions == 4
+        assert len(issues) == 8
+        assert sum("appears unused" in i for i in issues) == 3
+
+    def test_syntax_error(self):
+        code = "def foo(\n"
+        deductions, issues = check_correctness(code, parse_code(code))
+        assert deductions == 3
+        assert "line 1" in issues[0]
@@ -1,6 +1,13 @@
 """Tests for Concepts Agent topic matching and explanation."""
+import json
+
 import pytest
-from src.api.agents.concepts_agent.main import find_topic, get_mastery_tier
+from src.api.agents.concepts_agent.main import (
+    EXPLANATION_BODIES,
+    TOPIC_EXPLANATIONS,
+    find_topic,
+    get_mastery_tier,
+)
 
 
 class TestFindTopic:
@@ -36,3 +43,20 @@ class TestMasteryTier:
     def test_intermediate(self):
         assert get_mastery_tier(41) == "intermediate"
         assert get_mastery_tier(100) == "intermediate"
+
+
+class TestExplanationBodies:
+    def test_every_topic_and_tier_rendered(self):
+        for topic in TOPIC_EXPLANATIONS:
+            assert (topic, "beginner") in EXPLANATION_BODIES
+            assert (topic, "intermediate") in EXPLANATION_BODIES
+
+    def test_body_matches_source(self):
+        body = json.loads(EXPLANATION_BODIES[("variables", "beginner")])
+        assert body["topic"] == "variables"
+        assert body["explanation"] == TOPIC_EXPLANATIONS["variables"]["beginner"]["explanation"]
+        assert body["difficulty_adapted"] == "beginner"
+
+    def test_missing_tier_falls_back_to_beginner(self):
+        body = json.loads(EXPLANATION_BODIES[("files", "intermediate")])
+        assert body["difficulty_adapted"] == "beginner"
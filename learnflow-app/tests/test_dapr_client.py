@@ -0,0 +1,45 @@
+"""Tests for Dapr state write batching."""
+import asyncio
+
+import pytest
+from src.api.shared import dapr_client
+
+
+@pytest.fixture
+def posted(monkeypatch):
+    """Replace the state store POST; returns the list of bodies sent."""
+    bodies = []
+
+    async def post(items):
+        bodies.append(items)
+
+    monkeypatch.setattr(dapr_client, "_post_state", post)
+    monkeypatch.setattr(dapr_client, "_pending_state", {})
+    monkeypatch.setattr(dapr_client, "_state_flush", None)
+    return bodies
+
+
+class TestSaveStateBatching:
+    def test_concurrent_writes_share_one_request(self, posted):
+        async def burst():
+            await asyncio.gather(*(dapr_client.save_state(f"k{i}", i) for i in range(3)))
+
+        asyncio.run(burst())
+        assert posted == [[{"key": "k0", "value": 0}, {"key": "k1", "value": 1}, {"key": "k2", "value": 2}]]
+
+    def test_last_write_to_a_key_wins(self, posted):
+        async def burst():
+            await asyncio.gather(dapr_client.save_state("k", 1), dapr_client.save_state("k", 2))
+
+        asyncio.run(burst())
+        assert posted == [[{"key": "k", "value": 2}]]
+
+    def test_sequential_writes_are_separate_requests(self, posted):
+        asyncio.run(dapr_client.save_state("a", 1))
+        asyncio.run(dapr_client.save_state("b", 2))
+        assert len(posted) == 2
+
+    def test_save_state_now_skips_the_batch(self, posted):
+        asyncio.run(dapr_client.save_state_now("k", 1))
+        assert posted == [[{"key": "k", "value": 1}]]
+        assert dapr_client._state_flush is None
@@ -1,47 +1,109 @@
 """Tests for Debug Agent error detection."""
 import pytest
 from src.api.agents.debug_agent.main import detect_error_type
+from src.api.shared.schemas import ErrorType
 
 
 class TestErrorDetection:
     def test_syntax_error_detected(self):
         code = "def foo(\n"
         result = detect_error_type(code, None)
-        assert result["error_type"].value == "syntax"
+        assert result.error_type is ErrorType.SYNTAX
 
     def test_name_error_from_output(self):
         code = "print(undefined_var)"
         error = "NameError: name 'undefined_var' is not defined"
         result = detect_error_type(code, error)
-        assert result["error_type"].value == "runtime"
-        assert "variable" in result["explanation"].lower() or "defined" in result["explanation"].lower()
+        assert result.error_type is ErrorType.RUNTIME
+        assert "variable" in result.explanation.lower() or "defined" in result.explanation.lower()
 
     def test_type_error_from_output(self):
         error = "TypeError: unsupported operand type(s) for +: 'int' and 'str'"
         result = detect_error_type("x = 1 + 'hello'", error)
-        assert result["error_type"].value == "runtime"
-        assert "type" in result["explanation"].lower()
+        assert result.error_type is ErrorType.RUNTIME
+        assert "type" in result.explanation.lower()
 
     def test_index_error(self):
         error = "IndexError: list index out of range"
         result = detect_error_type("x = [1,2]; print(x[5])", error)
-        assert result["error_type"].value == "runtime"
-        assert "index" in result["explanation"].lower() or "list" in result["explanation"].lower()
+        assert result.error_type is ErrorType.RUNTIME
+        assert "index" in result.explanation.lower() or "list" in result.explanation.lower()
 
     def test_zero_division(self):
         error = "ZeroDivisionError: division by zero"
         result = detect_error_type("print(1/0)", error)
-        assert result["error_type"].value == "runtime"
-        assert "zero" in result["explanation"].lower()
+        assert result.error_type is ErrorType.RUNTIME
+        assert "zero" in result.explanation.lower()
 
     def test_hints_provided(self):
         error = "SyntaxError: unexpected EOF while parsing"
         result = detect_error_type("def foo():", error)
-        assert result["hint1"]
-        assert result["hint2"]
-        assert result["concept"]
+        assert result.hint1
+        assert result.hint2
+        assert result.concept
 
     def test_unknown_error_fallback(self):
         result = detect_error_type("x = 1", "SomeWeirdError: something happened")
-        assert result["hint1"]
-        assert result["hint2"]
+        assert result.hint1
+        assert result.hint2
+
+    def test_unknown_error_name_is_skipped(self):
+        error = "SomeWeirdError: wrapped\nZeroDivisionError: division by zero"
+        result = detect_error_type("print(1/0)", error)
+        assert result.concept == "Error Handling"
+
+    def test_last_known_error_name_wins(self):
+        error = (
+            "KeyError: 'score'\n\nDuring handling of the above exception, another exception occurred:\n\n"
+            "ZeroDivisionError: division by zero"
+        )
+        result = detect_error_type("print(1/0)", error)
+        assert result.concept == "Error Handling"
+
+    def test_generic_response_is_shared(self):
+        first = detect_error_type("a", "ZeroDivisionError: float modulo")
+        second = detect_error_type("b", "ZeroDivisionError: integer modulo by zero")
+        assert first.explanation == "A ZeroDivisionError occurred in your code."
+        assert first is second
+
+    def test_error_name_must_be_whole_word(self):
+        result = detect_error_type("x = 1", "MyKeyError: something happened")
+        assert result.concept == "Debugging Techniques"
+
+    def test_error_output_skips_code_analysis(self):
+        result = detect_error_type("def foo(", "SomeWeirdError: something happened")
+        assert result.error_type is ErrorType.RUNTIME
+        assert result.concept == "Debugging Techniques"
+
+    def test_error_output_scan_is_bounded(self):
+        error = "ZeroDivisionError: division by zero" + " " * 10000
+        result = detect_error_type("print(1/0)", error)
+        assert result.concept == "Debugging Techniques"
+
+    def test_error_output_scan_keeps_the_exception_line(self):
+        error = "x" * 10000 + "\nZeroDivisionError: division by zero"
+        result = detect_error_type("print(1/0)", error)
+        assert result.concept == "Error Handling"
+
+    def test_while_true_without_break(self):
+        result = detect_error_type("while True:\n    x = 1\n", None)
+        assert result.error_type is ErrorType.LOGIC
+
+    def test_while_true_with_break_on_later_line(self):
+        code = "while True:\n    x = input()\n    if x:\n        break\n"
+        result = detect_error_type(code, None)
+        assert result.error_type is not ErrorType.LOGIC
+
+    @pytest.mark.parametrize("code", [
+        "while True:\n    breakpoint_hit = 1\n",
+        "while True:\n    x = 1  # break here later\n",
+        "while True:\n    print('break')\n",
+        "for i in range(3):\n    break\nwhile True:\n    x = 1\n",
+        "while True:\n    for i in range(3):\n        break\n",
+    ])
+    def test_break_outside_the_loop_does_not_count(self, code):
+        assert detect_error_type(code, None).error_type is ErrorType.LOGIC
+
+    def test_break_in_nested_loop_else_counts(self):
+        code = "while True:\n    for i in range(3):\n        pass\n    else:\n        break\n"
+        assert detect_error_type(code, None).error_type is not ErrorType.LOGIC
@@ -0,0 +1,47 @@
+"""Tests for Exercise Agent grading and exercise retrieval."""
+import pytest
+from src.api.agents.exercise_agent.main import get_exercises, grade_code
+
+
+class TestGradeCode:
+    def test_empty_submission(self):
+        result = grade_code("")
+        assert not result.passed
+        assert result.score == 0
+
+    def test_starter_placeholder_counts_as_empty(self):
+        assert grade_code("# Write your code here").score == 0
+        assert grade_code("# Write your solution here").score == 0
+        assert grade_code("# Write your advanced solution here").score == 0
+
+    def test_syntax_error(self):
+        result = grade_code("def foo(")
+        assert not result.passed
+        assert result.score == 10
+        assert "line 1" in result.feedback
+
+    def test_structured_code_passes(self):
+        code = "# add two numbers\ndef add(a, b):\n    return a + b\n\nprint(add(1, 2))"
+        result = grade_code(code)
+        assert result.passed
+        assert result.score == 90
+
+    def test_bare_expression_fails(self):
+        result = grade_code("x = 1")
+        assert not result.passed
+        assert result.score == 40
+
+    def test_print_in_string_does_not_count(self):
+        assert grade_code("msg = 'print def x'").score == 40
+
+
+class TestGetExercises:
+    def test_cycles_through_bank(self):
+        exercises = get_exercises("variables", "easy", 3)
+        assert len(exercises) == 3
+        assert exercises[0] is exercises[2]
+
+    def test_unknown_topic_uses_default(self):
+        exercises = get_exercises("unknown", "hard", 2)
+        assert exercises[0]["title"] == "Advanced Challenge"
+        assert exercises[0]["test_cases"] == []
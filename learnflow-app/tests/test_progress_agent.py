@@ -1,59 +1,61 @@
 """Tests for Progress Agent mastery calculation and struggle detection."""
 import pytest
-from src.api.agents.progress_agent.main import calculate_mastery, get_mastery_level
+from src.api.agents.progress_agent.main import STRUGGLE_PHRASES_RE, calculate_mastery, get_mastery_level
 from src.api.shared.schemas import MasteryLevel
 
 
-class TestMasteryCalculation:
-    def test_zero_inputs(self):
-        assert calculate_mastery(0, 0, 0, 0) == 0
-
-    def test_max_inputs(self):
-        # exercises_done=10 → exercise_score=100
-        # quiz=100, quality=100, streak=10→100
-        # 0.4*100 + 0.3*100 + 0.2*100 + 0.1*100 = 100
-        assert calculate_mastery(10, 100, 100, 10) == 100
+# (exercises_done, quiz_score, code_quality, streak) -> mastery
+MASTERY_CASES = [
+    pytest.param((0, 0, 0, 0), 0, id="zero_inputs"),
+    # 0.4*100 + 0.3*100 + 0.2*100 + 0.1*100 = 100
+    pytest.param((10, 100, 100, 10), 100, id="max_inputs"),
+    # 0.4*50 + 0.3*60 + 0.2*40 + 0.1*30 = 20+18+8+3 = 49
+    pytest.param((5, 60, 40, 3), 49, id="partial_progress"),
+    # exercises_done=20 capped at 100: 0.4 * 100
+    pytest.param((20, 0, 0, 0), 40, id="exercises_capped_at_100"),
+    # streak=15 capped at 100: 0.1 * 100
+    pytest.param((0, 0, 0, 15), 10, id="streak_capped_at_100"),
+    pytest.param((100, 100, 100, 100), 100, id="result_capped_at_100"),
+    # 0.4*30 + 0.3*70 + 0.2*50 + 0.1*20 = 12+21+10+2 = 45
+    pytest.param((3, 70, 50, 2), 45, id="formula_accuracy"),
+    # 0.3*6 + 0.2*1 = 2 exactly, but 1.9999... in floating point
+    pytest.param((0, 6, 1, 0), 2, id="whole_percentages_not_truncated"),
+]
+
+LEVEL_CASES = [
+    (0, MasteryLevel.BEGINNER),
+    (20, MasteryLevel.BEGINNER),
+    (40, MasteryLevel.BEGINNER),
+    (41, MasteryLevel.LEARNING),
+    (55, MasteryLevel.LEARNING),
+    (70, MasteryLevel.LEARNING),
+    (71, MasteryLevel.PROFICIENT),
+    (80, MasteryLevel.PROFICIENT),
+    (90, MasteryLevel.PROFICIENT),
+    (91, MasteryLevel.MASTERED),
+    (100, MasteryLevel.MASTERED),
+    # Out of range is clamped
+    (-5, MasteryLevel.BEGINNER),
+    (150, MasteryLevel.MASTERED),
+]
 
-    def test_partial_progress(self):
-        # exercises_done=5 → score=50
-        # quiz=60, quality=40, streak=3 → 30
-        # 0.4*50 + 0.3*60 + 0.2*40 + 0.1*30 = 20+18+8+3 = 49
-        assert calculate_mastery(5, 60, 40, 3) == 49
 
-    def test_exercises_capped_at_100(self):
-        # exercises_done=20 → capped at 100
-        result = calculate_mastery(20, 0, 0, 0)
-        assert result == 40  # 0.4 * 100
+class TestMasteryCalculation:
+    @pytest.mark.parametrize("metrics, expected", MASTERY_CASES)
+    def test_mastery(self, metrics, expected):
+        assert calculate_mastery(*metrics) == expected
 
-    def test_streak_capped_at_100(self):
-        result = calculate_mastery(0, 0, 0, 15)
-        assert result == 10  # 0.1 * 100
 
-    def test_result_capped_at_100(self):
-        assert calculate_mastery(100, 100, 100, 100) == 100
+class TestMasteryLevel:
+    @pytest.mark.parametrize("mastery, expected", LEVEL_CASES, ids=[str(m) for m, _ in LEVEL_CASES])
+    def test_level(self, mastery, expected):
+        assert get_mastery_level(mastery) == expected
 
-    def test_formula_accuracy(self):
-        # exercises=3→30, quiz=70, quality=50, streak=2→20
-        # 0.4*30 + 0.3*70 + 0.2*50 + 0.1*20 = 12+21+10+2 = 45
-        assert calculate_mastery(3, 70, 50, 2) == 45
 
+class TestStrugglePhrases:
+    def test_phrases_match_case_insensitively(self):
+        for message in ["I'm STUCK on this", "please Help Me", "so confused", "I don't understand loops"]:
+            assert STRUGGLE_PHRASES_RE.search(message)
 
-class TestMasteryLevel:
-    def test_beginner(self):
-        assert get_mastery_level(0) == MasteryLevel.BEGINNER
-        assert get_mastery_level(20) == MasteryLevel.BEGINNER
-        assert get_mastery_level(40) == MasteryLevel.BEGINNER
-
-    def test_learning(self):
-        assert get_mastery_level(41) == MasteryLevel.LEARNING
-        assert get_mastery_level(55) == MasteryLevel.LEARNING
-        assert get_mastery_level(70) == MasteryLevel.LEARNING
-
-    def test_proficient(self):
-        assert get_mastery_level(71) == MasteryLevel.PROFICIENT
-        assert get_mastery_level(80) == MasteryLevel.PROFICIENT
-        assert get_mastery_level(90) == MasteryLevel.PROFICIENT
-
-    def test_mastered(self):
-        assert get_mastery_level(91) == MasteryLevel.MASTERED
-        assert get_mastery_level(100) == MasteryLevel.MASTERED
+    def test_neutral_message(self):
+        assert STRUGGLE_PHRASES_RE.search("Here is my solution") is None
@@ -1,44 +1,189 @@
 """Tests for code sandbox execution."""
+import asyncio
+import marshal
+import os
+
 import pytest
-from src.api.sandbox.executor import execute_sandboxed
+from src.api.sandbox.executor import (
+    OUTPUT_LIMIT_BYTES,
+    SandboxPool,
+    _live_workers,
+    _read_output,
+    close_pool,
+    execute_sandboxed,
+    get_pool,
+)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def sandbox_pool():
+    """Fork the worker pool once for the module and stop it afterwards.
+
+    Each test then only pays for IPC and its own exec, and no idle workers
+    outlive the module.
+    """
+    pool = get_pool()
+    yield pool
+    close_pool()
+
+
+@pytest.fixture(scope="module")
+def run_sandboxed():
+    """execute_sandboxed memoized on the code string.
+
+    Only for pure snippets whose output a test just reads. Tests about the
+    executor's own behaviour - timing, limits, concurrency, result shape -
+    call execute_sandboxed for a run of their own.
+    """
+    results: dict[str, dict] = {}
+
+    def run(code: str) -> dict:
+        if code not in results:
+            results[code] = execute_sandboxed(code)
+        return results[code]
+
+    return run
 
 
 class TestSandboxExecution:
-    def test_simple_print(self):
-        result = execute_sandboxed('print("hello")')
+    def test_simple_print(self, run_sandboxed):
+        result = run_sandboxed('print("hello")')
         assert result["success"] is True
         assert "hello" in result["stdout"]
 
-    def test_math(self):
-        result = execute_sandboxed("print(2 + 3)")
+    def test_math(self, run_sandboxed):
+        result = run_sandboxed("print(2 + 3)")
         assert result["success"] is True
         assert "5" in result["stdout"]
 
-    def test_syntax_error(self):
-        result = execute_sandboxed("def foo(")
+    def test_syntax_error(self, run_sandboxed):
+        result = run_sandboxed("def foo(")
         assert result["success"] is False
         assert result["error_type"] == "syntax"
 
-    def test_runtime_error(self):
-        result = execute_sandboxed("print(1/0)")
+    def test_runtime_error(self, run_sandboxed):
+        result = run_sandboxed("print(1/0)")
         assert result["success"] is False
         assert result["error_type"] == "runtime"
         assert "ZeroDivisionError" in result["stderr"]
 
-    def test_multiline(self):
+    def test_multiline(self, run_sandboxed):
         code = "for i in range(3):\n    print(i)"
-        result = execute_sandboxed(code)
+        result = run_sandboxed(code)
         assert result["success"] is True
         assert "0" in result["stdout"]
         assert "2" in result["stdout"]
 
-    def test_function_definition(self):
+    def test_function_definition(self, run_sandboxed):
         code = "def add(a, b):\n    return a + b\nprint(add(3, 4))"
-        result = execute_sandboxed(code)
+        result = run_sandboxed(code)
         assert result["success"] is True
         assert "7" in result["stdout"]
 
+    def test_unicode_output(self, run_sandboxed):
+        result = run_sandboxed('print("héllo ✓")')
+        assert result["success"] is True
+        assert result["stdout"] == "héllo ✓\n"
+
+    def test_output_capped(self):
+        result = execute_sandboxed('while True:\n    print("x" * 1000)')
+        assert result["success"] is False
+        assert result["error_type"] == "runtime"
+        assert len(result["stdout"]) <= OUTPUT_LIMIT_BYTES
+
     def test_execution_time_reported(self):
         result = execute_sandboxed("x = 1")
         assert "execution_time_ms" in result
         assert isinstance(result["execution_time_ms"], int)
+
+    def test_results_match_response_schema(self):
+        # /execute builds ExecuteResponse with model_construct (no validation)
+        from src.api.sandbox.main import ExecuteResponse
+
+        for code in ['print("hello")', "def foo(", "print(1/0)", "import subprocess"]:
+            result = execute_sandboxed(code)
+            assert set(result) == set(ExecuteResponse.model_fields)
+            ExecuteResponse.model_validate(result, strict=True)
+
+    def test_endpoint_runs_submissions_concurrently(self):
+        from src.api.sandbox.main import ExecuteRequest, execute_code
+
+        async def run_all():
+            request = ExecuteRequest(code="import time\nprint(time.time())\ntime.sleep(0.5)\nprint(time.time())")
+            # Two always fit under MAX_CONCURRENT_EXECUTIONS, even on one CPU
+            return await asyncio.gather(*(execute_code(request) for _ in range(2)))
+
+        responses = asyncio.run(run_all())
+        assert all(r.success for r in responses)
+        spans = [tuple(map(float, r.stdout.split())) for r in responses]
+        # Each run started before the other finished
+        assert max(start for start, _ in spans) < min(end for _, end in spans)
+
+
+class TestSandboxPool:
+    @pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs Linux /proc")
+    def test_fork_during_run_closes_other_workers_handles(self):
+        pool = SandboxPool(size=0)
+        running = pool.acquire()
+        running.conn.send((5, 50))
+        running.conn.send_bytes(marshal.dumps(compile("import time\ntime.sleep(0.5)", "<t>", "exec")))
+
+        # Forked while the first worker is in flight (no longer "ready")
+        checker = pool.acquire()
+        probe = (
+            "import os\n"
+            f"print(os.path.exists('/proc/self/fd/{running.conn.fileno()}'))\n"
+            f"print(os.path.exists('/proc/self/fd/{checker.conn.fileno()}'))\n"
+            "fd = os.open('/proc/self/maps', os.O_RDONLY)\n"
+            "maps = b''\n"
+            "while chunk := os.read(fd, 65536):\n"
+            "    maps += chunk\n"
+            "os.close(fd)\n"
+            "print(sum(b'/dev/zero' in line for line in maps.splitlines()))\n"
+        )
+        checker.conn.send((5, 50))
+        checker.conn.send_bytes(marshal.dumps(compile(probe, "<t>", "exec")))
+        try:
+            result = _read_output(checker.conn.recv(), checker.output)
+            assert running.conn.recv()["success"] is True
+        finally:
+            pool.release(checker)
+            pool.release(running)
+
+        assert result["success"] is True, result["stderr"]
+        # Neither pipe's parent end is open, and only its own output map is
+        assert result["stdout"].split() == ["False", "False", "1"]
+        assert running not in _live_workers and checker not in _live_workers
+
+    def test_forks_happen_on_the_fork_thread(self, monkeypatch):
+        import threading
+
+        threads = []
+        spawn = SandboxPool._spawn
+
+        def recording_spawn(self):
+            threads.append(threading.current_thread().name)
+            return spawn(self)
+
+        monkeypatch.setattr(SandboxPool, "_spawn", recording_spawn)
+        pool = SandboxPool(size=1)
+        pool.fill()
+        ready = pool.acquire()
+        on_demand = pool.acquire()
+        pool.release(ready)
+        pool.release(on_demand)
+        assert len(threads) == 2
+        assert all(name.startswith("sandbox-fork") for name in threads)
+
+
+class TestDangerousPatterns:
+    def test_blocked_patterns_case_insensitive(self):
+        from src.api.sandbox.main import DANGEROUS_PATTERNS
+
+        for code in ["import os", "IMPORT  subprocess", "x = eval('1')", "__import__('sys')"]:
+            assert DANGEROUS_PATTERNS.search(code)
+
+    def test_similar_names_allowed(self):
+        from src.api.sandbox.main import DANGEROUS_PATTERNS
+
+        assert DANGEROUS_PATTERNS.search("import osmosis\nprint(evaluate(1))") is None